@@ -0,0 +1,116 @@
+"""
+Trabajos de validación en segundo plano: POST /validator/{name}/jobs crea
+uno y GET /jobs/{id} devuelve su estado y, al terminar, el EventData
+rellenado. Los trabajos se guardan en memoria del proceso del worker.
+"""
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+
+PENDING = "pending"
+DONE = "done"
+ERROR = "error"
+
+
+def content_key(name, data, lean=False):
+    """
+    Clave de un envío: el validador, si la respuesta es lean y el EventData
+    entero. No basta con los ficheros: fibonacci valida los tests de cada
+    fichero y el resto de validadores los devuelven rellenados.
+    """
+    digest = hashlib.sha256()
+    for part in [name.encode(), b"lean" if lean else b"", data.model_dump_json().encode()]:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Job:
+    def __init__(self, validator, key):
+        self.id = uuid.uuid4().hex
+        self.validator = validator
+        self.key = key
+        self.status = PENDING
+        self.submitted = time.time()
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    def finish(self, result=None, error=None):
+        self.status = ERROR if error is not None else DONE
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "validator": self.validator,
+            "status": self.status,
+            "submitted": self.submitted,
+            "finished": self.finished,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobStore:
+    """
+    Trabajos por id, en orden de llegada. Un envío igual a otro que no ha
+    fallado reutiliza su trabajo en lugar de validarse otra vez. Por encima
+    de maxsize se olvidan los trabajos terminados más antiguos.
+    Solo se usa desde el bucle de eventos, así que no necesita locks.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.created = 0
+        self.reused = 0
+        self._jobs = OrderedDict()
+        self._by_key = {}
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def find(self, key):
+        """El trabajo de un envío igual que no ha fallado, si lo hay."""
+        job = self._jobs.get(self._by_key.get(key))
+        if job is None or job.status == ERROR:
+            return None
+        self.reused += 1
+        return job
+
+    def finish(self, job, result=None, error=None):
+        """
+        Termina el trabajo. Uno que ha fallado (p. ej. con 429 o 504) deja de
+        ser el de su envío: el siguiente envío igual se valida otra vez.
+        """
+        job.finish(result, error)
+        if error is not None and self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+
+    def add(self, validator, key):
+        job = Job(validator, key)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        self.created += 1
+        self._evict()
+        return job
+
+    def _evict(self):
+        finished = [job for job in self._jobs.values() if job.status != PENDING]
+        for job in finished[:max(0, len(self._jobs) - self.maxsize)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+    def stats(self):
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "size": len(self._jobs),
+            "maxsize": self.maxsize,
+            "pending": statuses.count(PENDING),
+            "created": self.created,
+            "reused": self.reused,
+        }
@@ -0,0 +1,136 @@
+"""
+Trabajo de validación de los endpoints del worker, sin nada de FastAPI, para
+poder ejecutarlo fuera del bucle de eventos (en un hilo o en un pool de
+procesos). Las funciones reciben y devuelven solo datos que se pueden
+serializar, y cada proceso del pool tiene su propia caché de entradas.
+"""
+import threading
+import time
+from collections import defaultdict
+from os import getenv as env
+
+from validators.cache import InputCache
+from validators.registry import validator
+from validators.snapshots import SnapshotStore
+
+# Se importan al usarlos por primera vez (ver validators/registry.py)
+onePizza = validator("one-pizza")
+unicode24 = validator("unicode-24")
+unicode25 = validator("unicode-25")
+
+# Directorio con los snapshots binarios de las entradas (python -m
+# validators.snapshots); vacío para parsear siempre los ficheros de texto.
+# Solo existe en workers propios: el despliegue en Vercel no los compila
+INPUT_SNAPSHOT_DIR = env("INPUT_SNAPSHOT_DIR", "api/snapshots")
+inputs = InputCache("api/static", maxsize=int(env("INPUT_CACHE_SIZE", "32")),
+                    snapshots=SnapshotStore(INPUT_SNAPSHOT_DIR, "api/static") if INPUT_SNAPSHOT_DIR else None)
+
+# Última pizza puntuada de cada fichero de one-pizza. Los reenvíos que solo
+# cambian unos pocos ingredientes se puntúan por diferencias sobre ella.
+pizza_scores = {}
+# Un lock por fichero: los ficheros distintos se puntúan a la vez
+pizza_locks = defaultdict(threading.Lock)
+pizza_locks_lock = threading.Lock()
+PIZZA_DELTA_MAX = 64
+
+# Motor de simulación de rutas de unicode-24 ("step" o "numpy")
+UNICODE24_ENGINE = env("UNICODE24_ENGINE", "step")
+# Procesos para validar en paralelo las rutas de unicode-24 en niveles 1 y 2
+UNICODE24_PROCESSES = int(env("UNICODE24_PROCESSES", "1"))
+# Motor de puntuación de unicode-25 ("python" o "numpy")
+UNICODE25_SCORE_ENGINE = env("UNICODE25_SCORE_ENGINE", "python")
+# Guardar el horario de unicode-25 en columnas array('i') en lugar de tuplas
+UNICODE25_COLUMNAR = env("UNICODE25_COLUMNAR", "false").lower() in ("1", "true")
+# Errores de unicode-25 que se buscan: "first" (solo se devuelve el primero),
+# "all" o un número k
+UNICODE25_ERRORS = env("UNICODE25_ERRORS", "first")
+# Se comprueba al arrancar (los nombres son los de unicode25.ERROR_MODES, que
+# no se importa hasta la primera validación): con k < 1 no se buscaría ningún
+# error y cualquier horario saldría válido
+if UNICODE25_ERRORS not in ("first", "all") and not (UNICODE25_ERRORS.isdigit() and int(UNICODE25_ERRORS) >= 1):
+    raise ValueError(f"UNICODE25_ERRORS debe ser first, all o un número mayor que 0, no {UNICODE25_ERRORS!r}")
+
+
+def level_of(difficulty):
+    """Nivel de unicode-24 y unicode-25 según la dificultad del evento."""
+    match difficulty:
+        case 'medium':
+            return 2
+        case 'hard' | 'insane':
+            return 3
+    return 1
+
+
+def score_pizza(filename, clients, pizza):
+    """
+    Puntúa la pizza por diferencias con la última pizza del mismo fichero si
+    cambian como mucho PIZZA_DELTA_MAX ingredientes, y desde cero si no.
+    """
+    with pizza_locks_lock:
+        lock = pizza_locks[filename]
+    with lock:
+        state = pizza_scores.get(filename)
+        if state is not None and state.index is clients.index:
+            added, removed = state.changes(pizza)
+            if len(added) + len(removed) <= PIZZA_DELTA_MAX:
+                return state.update(added, removed)
+
+        state = onePizza.PizzaScore(clients.index, pizza)
+        pizza_scores[filename] = state
+        return state.score
+
+
+def one_pizza(filename, content):
+    """Puntuación de un fichero de one-pizza."""
+    # procesa el archivo base con el que se compara la entrada del usuario
+    clients = inputs.get("one-pizza", filename)
+    # Procesa el archivo subido (outfile).
+    pizza = onePizza.parse_output_file(content)
+    return score_pizza(filename, clients, pizza)
+
+
+def one_pizza_batch(filename, contents):
+    """Puntuaciones de N pizzas contra el mismo fichero y el tiempo que ha costado."""
+    clients = inputs.get("one-pizza", filename)
+
+    start = time.perf_counter()
+    pizzas = [onePizza.parse_output_file(content) for content in contents]
+    scores = clients.score_many(pizzas)
+    return scores.tolist(), time.perf_counter() - start
+
+
+def unicode24_solution(filename, difficulty, content):
+    """
+    Valida una solución de unicode-24 y devuelve (error, puntos).
+    content: el texto de la solución o un fichero abierto, que se lee ruta a
+    ruta.
+    """
+    [ds_size, _, _] = filename.split('_')
+    level = level_of(difficulty)
+    config = inputs.get("unicode-24", filename, level)
+    scoring_param, err = unicode24.validate_output(config, content, engine=UNICODE24_ENGINE, processes=UNICODE24_PROCESSES)
+    return err, 0 if err is not None else unicode24.score(scoring_param, ds_size, level)
+
+
+def unicode24_file(filename, difficulty, path):
+    """Como unicode24_solution, leyendo la solución del fichero path según se valida."""
+    with open(path, encoding="utf-8", newline="\n") as content:
+        return unicode24_solution(filename, difficulty, content)
+
+
+def unicode25_max_errors():
+    """Errores de unicode-25 que se buscan según UNICODE25_ERRORS (None: todos)."""
+    if UNICODE25_ERRORS in unicode25.ERROR_MODES:
+        return unicode25.ERROR_MODES[UNICODE25_ERRORS]
+    return int(UNICODE25_ERRORS)
+
+
+def unicode25_solution(filename, content):
+    """Valida y puntúa una solución de unicode-25. Devuelve (primer error o "", puntos)."""
+    # Una sola pasada por la solución: el índice lo reutilizan la validación y la puntuación
+    solution_schedule, _ = unicode25.parse_indexed(content, UNICODE25_COLUMNAR)
+    num_days, prof_hours_required, enrollments = inputs.get("unicode-25", filename)
+    errors = unicode25.validate_schedule(num_days, prof_hours_required, solution_schedule, unicode25_max_errors())
+    if errors:
+        return errors[0], 0
+    return "", unicode25.calculate_score(enrollments, solution_schedule, UNICODE25_SCORE_ENGINE)
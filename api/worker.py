@@ -1,14 +1,285 @@
-import cProfile
+import asyncio
+import contextvars
+import multiprocessing
+import hashlib
 import sys, os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
 from os import getenv as env
 
-from fastapi import FastAPI, HTTPException, staticfiles
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile, staticfiles
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
-from models.req import EventData
-from validators import fibonacci, onePizza, unicode24, unicode25
+from api import tasks
+from api.jobs import JobStore, content_key
+from models.req import EventData, PizzaBatch
+from validators.cache import ResultCache, content_digest
+from validators.registry import imported, validator
 
-app = FastAPI()
+try:
+    import orjson
+except ImportError:
+    # Opcional: sin orjson las respuestas se codifican con json
+    orjson = None
+
+# Se importa al usarlo por primera vez, como los de api/tasks.py
+fibonacci = validator("fibonacci")
+
+# Procesos del pool en el que se validan las soluciones (0: en un hilo del
+# propio worker, sin pool de procesos)
+VALIDATOR_PROCESSES = int(env("VALIDATOR_PROCESSES", "0"))
+# Validaciones en curso o en cola como máximo; por encima se responde 429
+VALIDATOR_MAX_PENDING = int(env("VALIDATOR_MAX_PENDING", "16"))
+# Segundos que se espera a una validación antes de responder 504, por debajo
+# del maxDuration de 60s de vercel.json
+VALIDATOR_TIMEOUT = float(env("VALIDATOR_TIMEOUT", "50"))
+# Resultados de validación que se recuerdan por contenido (0: sin caché) y
+# fichero SQLite opcional donde se guardan también
+RESULT_CACHE_SIZE = int(env("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_DB = env("RESULT_CACHE_DB", "")
+# Trabajos de /validator/{name}/jobs que se recuerdan como máximo
+JOBS_MAX = int(env("JOBS_MAX", "64"))
+# Valor por defecto de ?lean: respuestas sin el content de los ficheros (ni
+# su copia en el actual de one-pizza)
+LEAN_RESPONSES = env("LEAN_RESPONSES", "false").lower() in ("1", "true")
+
+# True mientras se ejecuta un trabajo de /jobs: sus validaciones no tienen
+# el timeout de las peticiones normales
+in_job = contextvars.ContextVar("in_job", default=False)
+# Huecos del pool reservados para la petición o el trabajo en curso (ver
+# ValidatorPool.reserve)
+reservation = contextvars.ContextVar("reservation", default=None)
+
+
+class Reservation:
+    """Huecos de un ValidatorPool reservados y aún sin usar."""
+
+    def __init__(self, pool, slots):
+        self.pool = pool
+        self.slots = slots
+
+    def take(self):
+        """Usa uno de los huecos; False si ya no queda ninguno."""
+        if self.slots == 0:
+            return False
+        self.slots -= 1
+        self.pool.reserved -= 1
+        return True
+
+    def release(self):
+        """Devuelve al pool los huecos que no se han usado."""
+        self.pool.reserved -= self.slots
+        self.slots = 0
+
+
+class ValidatorPool:
+    """
+    Ejecuta las funciones de api/tasks.py fuera del bucle de eventos, para que
+    una validación larga no bloquee /health ni el resto de peticiones.
+    Una validación que pasa del timeout sigue ocupando su hueco hasta que
+    termina de verdad, así que el límite de pendientes cuenta todo el trabajo
+    que hay en el pool.
+    """
+
+    def __init__(self, processes, max_pending, timeout):
+        self.processes = processes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = None
+        self.pending = 0
+        self.reserved = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def start(self):
+        # fork después de precargar las entradas: los procesos las heredan
+        if self.processes > 0:
+            self.executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("fork"))
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _done(self, future):
+        self.pending -= 1
+        self.completed += 1
+
+    def check_full(self, slots=1):
+        """
+        HTTPException 429 si no caben slots validaciones más: las pendientes y
+        los huecos reservados no pueden pasar de max_pending.
+        """
+        if self.pending + self.reserved + slots > self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Too Many Requests: validation queue is full")
+
+    def reserve_slots(self, slots):
+        """
+        Reserva slots huecos (HTTPException 429 si no caben) para validaciones
+        que se lanzarán más tarde desde un contexto con la Reservation en
+        reservation. Quien reserva tiene que liberar los que no use.
+        """
+        self.check_full(slots)
+        self.reserved += slots
+        return Reservation(self, slots)
+
+    @contextmanager
+    def reserve(self, slots=1):
+        """
+        Reserva slots huecos para las validaciones que se lanzan dentro del
+        bloque, incluidas las de tareas creadas en él: se comprueba el límite
+        una vez para todas, así que no se rechaza ninguna a medias. Dentro de
+        otra reserva (la de un trabajo de /jobs) se usa esa.
+        """
+        if reservation.get() is not None:
+            yield
+            return
+        held = self.reserve_slots(slots)
+        token = reservation.set(held)
+        try:
+            yield
+        finally:
+            reservation.reset(token)
+            held.release()
+
+    async def run(self, fn, *args):
+        """
+        Resultado de fn(*args). Usa un hueco reservado si lo hay y, si no,
+        HTTPException 429 si el pool está lleno. 504 si tarda demasiado
+        (salvo dentro de un trabajo de /jobs).
+        """
+        held = reservation.get()
+        if held is None or not held.take():
+            self.check_full()
+
+        # Sin pool de procesos, run_in_executor usa los hilos por defecto del bucle
+        executor = self.executor
+        future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        self.pending += 1
+        future.add_done_callback(self._done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), None if in_job.get() else self.timeout)
+        except asyncio.CancelledError:
+            # Ya nadie espera el resultado: si aún no ha empezado no se ejecuta
+            future.cancel()
+            raise
+        except TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail=f"Gateway Timeout: validation took more than {self.timeout:g}s")
+        except BrokenProcessPool:
+            # Un proceso ha muerto (p. ej. sin memoria): el pool ya no acepta
+            # trabajo, así que se crea otro para las siguientes peticiones
+            if self.executor is executor:
+                self.shutdown()
+                self.start()
+            raise
+
+    def stats(self):
+        return {
+            "processes": self.processes,
+            "pending": self.pending,
+            "reserved": self.reserved,
+            "maxPending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+pool = ValidatorPool(VALIDATOR_PROCESSES, VALIDATOR_MAX_PENDING, VALIDATOR_TIMEOUT)
+results = ResultCache("api/static", RESULT_CACHE_SIZE, RESULT_CACHE_DB or None)
+jobs = JobStore(JOBS_MAX)
+# Tareas de los trabajos en curso (el bucle solo guarda referencias débiles)
+job_tasks = set()
+
+
+async def result_key(problem, filename, level, content):
+    """Clave del resultado de un envío en la caché de resultados."""
+    # hashlib suelta el GIL con textos grandes: se calcula en un hilo
+    return results.key(problem, filename, level, await asyncio.to_thread(content_digest, content))
+
+
+async def result_cache(method, *args):
+    """
+    results.get o results.put. Con RESULT_CACHE_DB consultan y escriben en
+    SQLite (con commit y fsync), así que se llaman en un hilo, fuera del bucle.
+    """
+    if results.on_disk:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+async def run_cached(key, fn, *args):
+    """Resultado guardado para key o, si no lo hay, el de pool.run(fn, *args)."""
+    value = await result_cache(results.get, key)
+    if value is None:
+        value = await pool.run(fn, *args)
+        await result_cache(results.put, key, value)
+    return value
+
+
+async def score_one_pizza(filename, content):
+    """Puntuación de un fichero de one-pizza, de la caché de resultados o del pool."""
+    key = await result_key("one-pizza", filename, None, content)
+    return await run_cached(key, tasks.one_pizza, filename, content)
+
+
+async def event_data(request: Request) -> EventData:
+    """
+    EventData del cuerpo de la petición, validado por pydantic directamente
+    desde los bytes: sin el json.loads y el dict intermedio con los que lo
+    valida FastAPI, que con un content de varios MB tardan el doble.
+    """
+    try:
+        return EventData.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False, include_input=False)])
+
+
+def event_dump(data, lean=False):
+    """
+    El EventData rellenado como dict para la respuesta, que jsonable_encoder
+    ya no tiene que recorrer modelo a modelo. Con lean, sin el content de los
+    ficheros.
+    """
+    return data.model_dump(exclude={"files": {"__all__": {"content"}}} if lean else None, warnings=False)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse codificada con orjson si está instalado."""
+
+    def render(self, content):
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def copy_and_hash(source, target):
+    """Copia source en target por bloques y devuelve el SHA-256 de lo copiado."""
+    digest = hashlib.sha256()
+    while chunk := source.read(1 << 20):
+        digest.update(chunk)
+        target.write(chunk)
+    return digest.hexdigest()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parsea por adelantado los ficheros de entrada indicados en INPUT_CACHE_WARMUP
+    tasks.inputs.warm_up(env("INPUT_CACHE_WARMUP", ""))
+    pool.start()
+    yield
+    pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 app.mount(
     "/static",
     staticfiles.StaticFiles(directory="api/static"),
@@ -29,24 +300,42 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Devuelve los contadores de la caché de ficheros de entrada (la del
+    proceso del worker; con VALIDATOR_PROCESSES > 0 cada proceso del pool
+    tiene la suya) y del pool de validación, con los validadores que ya se
+    han importado en el proceso del worker.
+    """
+    return {
+        "inputs": tasks.inputs.stats(),
+        "validators": {**pool.stats(), "imported": imported()},
+        "results": results.stats(),
+        "jobs": jobs.stats()
+    }
+
+
 @app.post("/validator/one-pizza")
-async def validator_one_pizza(data: EventData):
+async def validator_one_pizza(data: EventData = Depends(event_data), lean: bool = LEAN_RESPONSES):
     try:
         id = 0
         data.points = 0
-        for file in data.files:
+        # Los ficheros son independientes: cada uno se puntúa por su lado en el
+        # pool y se recogen en el orden del envío. Los huecos de todos se
+        # reservan antes (429 para la petición entera si no caben) y, si falla
+        # uno, se cancelan los demás y se responde con su error
+        with pool.reserve(len(data.files)):
+            scoring = [asyncio.create_task(score_one_pizza(file.filename, file.content)) for file in data.files]
+            try:
+                scores = await asyncio.gather(*scoring)
+            except BaseException:
+                for task in scoring:
+                    task.cancel()
+                raise
+        for file, score in zip(data.files, scores):
             filename = file.filename
             content = file.content
-
-            # procesa el archivo base con el que se compara la entrada del usuario
-            with open(f'api/static/one-pizza/{filename}', 'r', encoding='utf-8') as f:
-                infile_content = f.readlines()
-                _, clients = onePizza.parse_input_file(infile_content)
-            
-            # Procesa el archivo subido (outfile).
-            pizza = onePizza.parse_output_file(content)
-
-            score = onePizza.calculate_score(clients, pizza)
             print(score)
 
             data.points = max(data.points, score)
@@ -58,14 +347,41 @@ async def validator_one_pizza(data: EventData):
                         "path": f"{env("API_URL")}/static/one-pizza/{filename}",
                     }
                 },
-                "actual": content,
+                "actual": None if lean else content,
                 "success": score > 0,
                 "points": score
             })
             id += 1
 
-        return data
+        return event_dump(data, lean)
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal Server Error: {str(e)}"
+        )
+
+
+@app.post("/validator/one-pizza/batch")
+async def validator_one_pizza_batch(data: PizzaBatch):
+    """
+    Puntúa N pizzas candidatas contra el mismo fichero de entrada en una sola
+    pasada vectorizada (p. ej. para recalcular una clasificación completa).
+    """
+    try:
+        scores, elapsed = await pool.run(tasks.one_pizza_batch, data.filename, data.contents)
+
+        return {
+            "filename": data.filename,
+            "scores": scores,
+            "elapsed": elapsed,
+            "pizzasPerSecond": len(scores) / elapsed if elapsed > 0 else None
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -74,7 +390,7 @@ async def validator_one_pizza(data: EventData):
 
 
 @app.post("/validator/fibonacci")
-async def validator_fibonacci(data: EventData):
+async def validator_fibonacci(data: EventData = Depends(event_data), lean: bool = LEAN_RESPONSES):
     try:
         for test in data.files[0].tests:
             outputs = [int(x) for x in test.actual.split(", ")]
@@ -83,7 +399,7 @@ async def validator_fibonacci(data: EventData):
             test.actual = test.output.stdout
             test.points = 5 if success else 0
 
-        return data
+        return event_dump(data, lean)
 
     except Exception as e:
         raise HTTPException(
@@ -92,18 +408,11 @@ async def validator_fibonacci(data: EventData):
         )
 
 @app.post("/validator/unicode-24")
-async def validator_unicode24(data: EventData):
+async def validator_unicode24(data: EventData = Depends(event_data), lean: bool = LEAN_RESPONSES):
     try:
         filename = data.files[0].filename
-        [ds_size, _, _] = filename.split('_')
-        level = 1
-        match data.difficulty:
-            case 'medium':
-                level = 2 
-            case 'hard' | 'insane':
-                level = 3 
-        config = unicode24.MapConfig(f"api/static/unicode-24/{filename}", level)
-        scoring_param, err = unicode24.validate_output(config, data.files[0].content)
+        key = await result_key("unicode-24", filename, tasks.level_of(data.difficulty), data.files[0].content)
+        err, points = await run_cached(key, tasks.unicode24_solution, filename, data.difficulty, data.files[0].content)
         data.files[0].tests[0] = {
             "id": 1,
             "input": {
@@ -114,10 +423,42 @@ async def validator_unicode24(data: EventData):
             },
             "actual": err,
             "success": err is None,
-            "points": 0 if err is not None else unicode24.score(scoring_param, ds_size, level) 
+            "points": points
         }
         data.points = sum(test["points"] for test in data.files[0].tests)
-        return data
+        return event_dump(data, lean)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal Server Error: {str(e)}"
+        )
+
+@app.post("/validator/unicode-24/upload")
+async def validator_unicode24_upload(filename: str = Form(...), difficulty: str = Form(...), file: UploadFile = File(...)):
+    """
+    Igual que /validator/unicode-24 pero con la solución subida como fichero
+    (multipart) en lugar de en el JSON. Las rutas se validan según se leen
+    del fichero, sin cargarlo entero en memoria.
+    """
+    try:
+        # El pool lee la solución de disco: se copia por bloques a un fichero
+        # temporal que se borra al acabar (en Linux, aunque siga abierto)
+        with tempfile.NamedTemporaryFile(suffix=".txt") as solution:
+            digest = await asyncio.to_thread(copy_and_hash, file.file, solution)
+            solution.flush()
+            key = results.key("unicode-24", filename, tasks.level_of(difficulty), digest)
+            err, points = await run_cached(key, tasks.unicode24_file, filename, difficulty, solution.name)
+        return {
+            "filename": filename,
+            "difficulty": difficulty,
+            "actual": err,
+            "success": err is None,
+            "points": points
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -125,18 +466,11 @@ async def validator_unicode24(data: EventData):
         )
 
 @app.post("/validator/unicode-25")
-async def validator_unicode25(data: EventData):
+async def validator_unicode25(data: EventData = Depends(event_data), lean: bool = LEAN_RESPONSES):
     try:
         filename = data.files[0].filename
-        level = 1
-        match data.difficulty:
-            case 'medium':
-                level = 2 
-            case 'hard' | 'insane':
-                level = 3 
-        solution_schedule, _ = unicode25.parse_output(data.files[0].content)
-        num_days, prof_hours_required, enrollments = unicode25.parse_input(f"api/static/unicode-25/{filename}")
-        errors = unicode25.validate_schedule(num_days, prof_hours_required, solution_schedule)
+        key = await result_key("unicode-25", filename, tasks.level_of(data.difficulty), data.files[0].content)
+        actual, points = await run_cached(key, tasks.unicode25_solution, filename, data.files[0].content)
         data.files[0].tests[0] = {
             "id": 1,
             "input": {
@@ -145,12 +479,14 @@ async def validator_unicode25(data: EventData):
                     "path": f"{env("API_URL")}/static/unicode-25/{filename}",
                 }
             },
-            "actual": errors[0] if len(errors) > 0 else "",
-            "success": len(errors) == 0,
-            "points": 0 if len(errors) > 0 else unicode25.calculate_score(enrollments, solution_schedule)
+            "actual": actual,
+            "success": actual == "",
+            "points": points
         }
         data.points = sum(test["points"] for test in data.files[0].tests)
-        return data
+        return event_dump(data, lean)
+    except HTTPException:
+        raise
     except Exception as e:
         exc_type, exc_obj, exc_tb = sys.exc_info()
         fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
@@ -159,3 +495,65 @@ async def validator_unicode25(data: EventData):
             status_code=500,
             detail=f"Internal Server Error: {str(e)}" # {exc_type} {fname}  {exc_tb.tb_lineno}"
         )
+
+
+# Validadores que se pueden lanzar como trabajo en segundo plano
+JOB_VALIDATORS = {
+    "one-pizza": validator_one_pizza,
+    "fibonacci": validator_fibonacci,
+    "unicode-24": validator_unicode24,
+    "unicode-25": validator_unicode25,
+}
+
+
+async def run_job(job, validate, data, lean, held):
+    # held: los huecos del pool reservados al aceptar el trabajo
+    in_job.set(True)
+    reservation.set(held)
+    try:
+        jobs.finish(job, result=await validate(data, lean))
+    except HTTPException as e:
+        jobs.finish(job, error={"status": e.status_code, "detail": e.detail})
+    finally:
+        held.release()
+
+
+@app.post("/validator/{name}/jobs", status_code=202)
+async def submit_job(name: str, data: EventData = Depends(event_data), lean: bool = LEAN_RESPONSES):
+    """
+    Valida el envío en segundo plano, sin el límite de tiempo de las
+    peticiones normales, y devuelve el id del trabajo al momento. Un envío
+    idéntico (validador y cuerpo entero) a otro que no ha fallado devuelve el
+    trabajo que ya existe.
+    """
+    validate = JOB_VALIDATORS.get(name)
+    if validate is None:
+        raise HTTPException(status_code=404, detail=f"Not Found: unknown validator '{name}'")
+
+    # Como en result_key, el hash del envío se calcula en un hilo
+    key = await asyncio.to_thread(content_key, name, data, lean)
+    job = jobs.find(key)
+    if job is not None:
+        return {"id": job.id, "status": job.status, "reused": True}
+
+    # Los huecos que usará el trabajo se reservan al aceptarlo (429 si no
+    # caben), no cuando empieza: si no, una ráfaga de envíos se aceptaría
+    # entera y fallaría después. one-pizza valida cada fichero por su lado
+    held = pool.reserve_slots(len(data.files) if name == "one-pizza" else 1)
+    job = jobs.add(name, key)
+    task = asyncio.create_task(run_job(job, validate, data, lean, held))
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+    return {"id": job.id, "status": job.status, "reused": False}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Estado de un trabajo ("pending", "done" o "error"). Al terminar incluye
+    el EventData rellenado (result) o el error con su código HTTP (error).
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Not Found: unknown job '{job_id}'")
+    return job.to_dict()
@@ -0,0 +1,92 @@
+"""
+Arranque en frío del worker, cada medida en un proceso nuevo (como una
+instancia recién creada de vercel.json):
+- import de api.worker según python -X importtime: total y los imports que
+  más tardan,
+- tiempo hasta la primera respuesta de /health y de un validador (el primer
+  uso de su módulo lo importa).
+Además sirve de guarda: falla (código de salida 1) si al importar el worker
+se importa numpy o algún módulo de validators/registry.py, o si el import
+pasa de budget_ms.
+Ejecutar desde la raíz del repositorio: python benchmarks/cold_start.py [budget_ms]
+"""
+import json
+import os
+import subprocess
+import sys
+
+sys.path.append(".")
+
+from validators.registry import VALIDATORS
+
+# Módulos que no se importan al arrancar: se cargan con la primera petición que los usa
+LAZY = ["numpy", *VALIDATORS.values()]
+REPEAT = 5
+
+FIRST_RESPONSE = """
+import json, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from api import worker
+imported = time.perf_counter()
+with TestClient(worker.app) as client:
+    assert client.get("/health").status_code == 200
+    health = time.perf_counter()
+    body = {"event": "bench", "title": "fibonacci", "difficulty": "easy", "points": 0, "files": [{
+        "filename": "x", "type": "text/plain", "size": 0, "languageId": 0, "content": "",
+        "tests": [{"id": 1, "visibility": "public", "actual": "1, 1, 2, 3", "output": {"stdout": "1, 1, 2, 3"}}]}]}
+    assert client.post("/validator/fibonacci", json=body).status_code == 200
+    fibonacci = time.perf_counter()
+    body = {**body, "title": "unicode-25", "files": [{**body["files"][0], "filename": "dummy.txt", "content": "", "tests": [{"id": 1, "visibility": "public"}]}]}
+    assert client.post("/validator/unicode-25", json=body).status_code == 200
+    unicode25 = time.perf_counter()
+print(json.dumps({"import": imported - start, "health": health - start, "fibonacci": fibonacci - start, "unicode-25": unicode25 - start}))
+"""
+
+
+def run(*args):
+    env = {**os.environ, "API_URL": os.environ.get("API_URL", "http://localhost:3000")}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def import_times():
+    """(total en µs, [(acumulado µs, módulo)] de los imports directos) de importar api.worker."""
+    rows = []
+    for line in run("-X", "importtime", "-c", "import api.worker").stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[13:] or "self [us]" in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    # Cada módulo sale después de sus imports: los directos del worker son los
+    # de tres espacios de sangría desde el módulo de nivel superior anterior
+    end = next(i for i, (_, name) in enumerate(rows) if name == " api.worker")
+    start = max((i for i, (_, name) in enumerate(rows[:end]) if not name.startswith("  ")), default=-1) + 1
+    top = [(cumulative, name.strip()) for cumulative, name in rows[start:end] if name.startswith("   ") and not name.startswith("    ")]
+    return rows[end][0], sorted(top, reverse=True)
+
+
+def main(budget_ms=None):
+    best_total, best_top = min(import_times() for _ in range(REPEAT))
+    print(f"import api.worker {best_total / 1000:8.1f} ms")
+    for cumulative, name in best_top[:8]:
+        print(f"  {name:30} {cumulative / 1000:8.1f} ms")
+
+    first = [json.loads(run("-c", FIRST_RESPONSE).stdout) for _ in range(REPEAT)]
+    for step in ["import", "health", "fibonacci", "unicode-25"]:
+        print(f"{'hasta ' + step:22} {min(times[step] for times in first) * 1000:8.1f} ms")
+
+    # Guarda contra regresiones
+    errors = []
+    startup = run("-c", "import sys, json; from api import worker; print(json.dumps(sorted(sys.modules)))")
+    eager = [name for name in LAZY if name in json.loads(startup.stdout)]
+    if eager:
+        errors.append(f"se importan al arrancar: {', '.join(eager)}")
+    if budget_ms is not None and best_total / 1000 > float(budget_ms):
+        errors.append(f"import api.worker {best_total / 1000:.1f} ms > {float(budget_ms):g} ms")
+    for error in errors:
+        print(f"ERROR: {error}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,47 @@
+"""
+Tiempo de carga y memoria (pico y retenida, según tracemalloc) de los
+ficheros de entrada grandes con los loaders de validators/cache.py, los que
+usa InputCache en un fallo de caché.
+Ejecutar desde la raíz del repositorio: python benchmarks/input_loads.py
+"""
+import sys
+import time
+import tracemalloc
+
+sys.path.append(".")
+
+from validators.cache import LOADERS
+
+STATIC = "api/static"
+INPUTS = [
+    ("one-pizza", "d_difficult.txt", None),
+    ("one-pizza", "e_elaborate.txt", None),
+    ("unicode-24", "crazy_easy_dataset.txt", 1),
+    ("unicode-24", "crazy_medium_dataset.txt", 2),
+    ("unicode-25", "hard.txt", None),
+]
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    for problem, filename, level in INPUTS:
+        path = f"{STATIC}/{problem}/{filename}"
+        elapsed = best_of(lambda: LOADERS[problem](path, level))
+        tracemalloc.start()
+        value = LOADERS[problem](path, level)
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del value
+        print(f"{problem + '/' + filename:36} {elapsed * 1000:7.1f} ms  pico {peak / 2**20:5.1f} MiB  retenida {kept / 2**20:5.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
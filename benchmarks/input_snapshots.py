@@ -0,0 +1,61 @@
+"""
+Tiempo de carga de los ficheros de entrada grandes parseando el texto (con
+los loaders de validators/cache.py, más el índice de ingredientes en
+one-pizza) frente a su snapshot binario de validators/snapshots.py, que es lo
+que cuesta un fallo de InputCache en un proceso recién arrancado.
+Los snapshots se compilan antes en un directorio temporal.
+Ejecutar desde la raíz del repositorio: python benchmarks/input_snapshots.py
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(".")
+
+from validators.cache import LOADERS
+from validators.snapshots import SnapshotStore
+
+STATIC = "api/static"
+INPUTS = [
+    ("one-pizza", "d_difficult.txt", None),
+    ("one-pizza", "e_elaborate.txt", None),
+    ("unicode-24", "crazy_easy_dataset.txt", 1),
+    ("unicode-24", "crazy_hard_dataset.txt", 3),
+    ("unicode-25", "hard.txt", None),
+]
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def texto(problem, filename, level):
+    value = LOADERS[problem](f"{STATIC}/{problem}/{filename}", level)
+    if problem == "one-pizza":
+        value.index
+    return value
+
+
+def main():
+    snapshot_dir = tempfile.mkdtemp()
+    try:
+        store = SnapshotStore(snapshot_dir, STATIC)
+        print(f"{'':36} {'texto':>10} {'snapshot':>10}")
+        for problem, filename, level in INPUTS:
+            store.compile(problem, filename)
+            parsed = best_of(lambda: texto(problem, filename, level))
+            loaded = best_of(lambda: store.load(problem, filename, level))
+            print(f"{problem + '/' + filename:36} {parsed * 1000:7.1f} ms {loaded * 1000:7.1f} ms")
+        assert store.stale == store.missing == 0
+    finally:
+        shutil.rmtree(snapshot_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Latencia de POST /validator/one-pizza con los cinco ficheros de entrada a la
+vez, con los ficheros puntuados en un hilo (VALIDATOR_PROCESSES=0) o
+repartidos en un pool de procesos, frente al fichero más lento por separado.
+Las entradas se parsean antes de arrancar el pool, que las hereda, y la caché
+de resultados está desactivada.
+Ejecutar desde la raíz del repositorio: python benchmarks/one_pizza_files.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(".")
+
+from fastapi.testclient import TestClient
+
+from api import tasks, worker
+from validators import onePizza
+
+STATIC = "api/static/one-pizza"
+
+
+def pizza(filename):
+    # Todos los ingredientes que le gustan a algún cliente
+    with open(f"{STATIC}/{filename}", encoding="utf-8") as f:
+        ingredients, _ = onePizza.parse_input_file(f.readlines())
+    return f"{len(ingredients)} " + " ".join(sorted(ingredients))
+
+
+def body(contents):
+    return {
+        "event": "bench",
+        "title": "one-pizza",
+        "difficulty": "easy",
+        "points": 0,
+        "files": [{"filename": filename, "type": "text/plain", "size": len(content), "languageId": 0, "content": content, "tests": []}
+                  for filename, content in contents.items()],
+    }
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    contents = {filename: pizza(filename) for filename in sorted(os.listdir(STATIC))}
+    for filename in contents:
+        tasks.inputs.get("one-pizza", filename)
+    worker.results.maxsize = 0
+    # Siempre desde cero, sin puntuar por diferencias con el envío anterior
+    # (los procesos del pool heredan el valor)
+    tasks.PIZZA_DELTA_MAX = -1
+
+    single = {filename: best_of(lambda: onePizza.PizzaScore(tasks.inputs.get("one-pizza", filename).index, onePizza.parse_output_file(content)).score)
+              for filename, content in contents.items()}
+    for filename, elapsed in single.items():
+        print(f"{filename:20} {elapsed * 1000:9.1f} ms")
+    print(f"{'suma':20} {sum(single.values()) * 1000:9.1f} ms  máximo {max(single.values()) * 1000:.1f} ms")
+
+    for processes in [0, len(contents)]:
+        worker.pool.processes = processes
+        with TestClient(worker.app) as client:
+            def post():
+                assert client.post("/validator/one-pizza", json=body(contents)).status_code == 200
+            print(f"POST procesos {processes}    {best_of(post) * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
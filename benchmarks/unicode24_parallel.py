@@ -0,0 +1,55 @@
+"""
+Serial vs process pool validation of a whole unicode-24 submission at levels 1 and 2.
+Run from the repository root: python benchmarks/unicode24_parallel.py
+"""
+import sys
+import time
+
+sys.path.append(".")
+
+from validators import unicode24
+
+STATIC = "api/static/unicode-24"
+
+
+def submission(config, movs="50>50<"):
+  # Valid solution visiting every point, with a short loop when it fits
+  points = config.delivery_points
+  order = [None] * len(points)
+  for point_id, point in enumerate(points, 1):
+    if point["s"] is not None:
+      order[point["s"] - 1] = point_id
+  free = iter(point_id for point_id in range(1, len(points) + 1) if points[point_id - 1]["s"] is None)
+  order = [point_id if point_id is not None else next(free) for point_id in order]
+
+  routes, total_movs = [], 0
+  for point_id in order:
+    coords = points[point_id - 1]["coords"]
+    _, num_movs, err = config.traverse_path(coords, movs)
+    route_movs = movs if err is None else "0>"
+    total_movs += num_movs if err is None else 0
+    routes.append(f"{point_id};{coords[0]},{coords[1]};{route_movs}")
+  return "\n".join([str(total_movs)] + routes)
+
+
+def bench(filename, level, repeat=3):
+  config = unicode24.MapConfig(f"{STATIC}/{filename}", level)
+  content = submission(config)
+  for processes in [1, 2, 4]:
+    best = float("inf")
+    for _ in range(repeat):
+      start = time.perf_counter()
+      movs, err = unicode24.validate_output(config, content, processes=processes)
+      best = min(best, time.perf_counter() - start)
+      assert err is None, err
+    print(f"{filename:28} level {level}  {len(config.delivery_points):>7} routes  {processes} processes  {best * 1000:9.1f} ms")
+
+
+def main():
+  bench("crazy_easy_dataset.txt", 1)
+  bench("crazy_medium_dataset.txt", 2)
+  bench("big_medium_dataset.txt", 2)
+
+
+if __name__ == '__main__':
+  main()
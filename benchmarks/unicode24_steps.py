@@ -0,0 +1,61 @@
+"""
+Per-step cost of unicode-24 route traversal on the big/crazy datasets, for
+each validate_output engine.
+Run from the repository root: python benchmarks/unicode24_steps.py
+"""
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from validators import unicode24
+
+STATIC = "api/static/unicode-24"
+STEPS = 20000
+
+
+def safe_route(config, rng, movs):
+  # Look for an origin where the route runs to the end without errors
+  for _ in range(200):
+    origin = (rng.randrange(1, config.dim[0] - 1), rng.randrange(1, config.dim[1] - 1))
+    _, _, err = config.traverse_path(origin, movs)
+    if err is None:
+      return origin
+  raise RuntimeError("no free origin found")
+
+
+def bench(filename, level, movs, repeat=3):
+  config = unicode24.MapConfig(f"{STATIC}/{filename}", level)
+  origin = safe_route(config, random.Random(filename), movs)
+  for engine, traverse_path in unicode24.ENGINES.items():
+    best = float("inf")
+    for _ in range(repeat):
+      start = time.perf_counter()
+      _, num_movs, err = traverse_path(config, origin, movs)
+      best = min(best, time.perf_counter() - start)
+      assert err is None, err
+    print(f"{filename:28} level {level}  {engine:5}  {num_movs:>7} steps  {best / num_movs * 1e6:8.3f} us/step")
+
+
+def main():
+  # Back and forth over two cells: every step goes through the full step logic
+  zigzag = "1>1<" * (STEPS // 2)
+  # Long straight runs
+  runs = "".join(f"{n}>{n}<" for n in [STEPS // 4] * 2)
+  # Closed random walk made of short runs
+  rng = random.Random(STEPS)
+  half = [(rng.choice("><-+"), rng.randint(1, 20)) for _ in range(STEPS // 20)]
+  opposite = {'>': '<', '<': '>', '-': '+', '+': '-'}
+  walk = "".join(f"{n}{mov}" for mov, n in half) + "".join(f"{n}{opposite[mov]}" for mov, n in reversed(half))
+  bench("crazy_hard_dataset.txt", 3, zigzag)
+  bench("crazy_hard_dataset.txt", 3, walk)
+  bench("big_hard_dataset.txt", 3, walk)
+  bench("crazy_medium_dataset.txt", 2, zigzag)
+  bench("crazy_medium_dataset.txt", 2, runs)
+  bench("big_medium_dataset.txt", 2, walk)
+  bench("crazy_easy_dataset.txt", 1, runs)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,52 @@
+"""
+Tiempo de validar una solución de unicode-25 con muchos errores según cuántos
+se buscan (max_errors de validate_schedule): el primero, 10 o todos.
+Ejecutar desde la raíz del repositorio: python benchmarks/unicode25_errors.py
+"""
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from validators import unicode25
+
+STATIC = "api/static/unicode-25"
+NUM_CLASSES = 100_000
+
+
+def solucion_rota(rng, num_days, prof_hours_required):
+    # Clases repartidas al azar en horas de 0 a 24: muchas fuera de horario
+    # (Regla 5), solapes de profesor (Regla 3) y de materia (Regla 2)
+    keys = list(prof_hours_required)
+    lines = []
+    for day in range(1, num_days + 1):
+        classes = []
+        for _ in range(NUM_CLASSES // num_days):
+            prof, materia = rng.choice(keys)
+            start = rng.randrange(24)
+            classes.append(f"{prof} {materia} {start} {start + rng.randint(1, 3)}")
+        lines += [f"{day} {len(classes)}"] + classes
+    return "\n".join(lines) + "\n"
+
+
+def bench(content, num_days, prof_hours_required, repeat=3):
+    for mode in ["first", 10, "all"]:
+        max_errors = unicode25.ERROR_MODES[mode] if mode in unicode25.ERROR_MODES else mode
+        best = float("inf")
+        for _ in range(repeat):
+            index, _ = unicode25.parse_indexed(content)
+            start = time.perf_counter()
+            errors = unicode25.validate_schedule(num_days, prof_hours_required, index, max_errors)
+            best = min(best, time.perf_counter() - start)
+        print(f"{str(mode):6} {len(errors):>7} errores  {best * 1000:9.1f} ms  primero: {errors[0][:60]}")
+
+
+def main():
+    rng = random.Random(17)
+    num_days, prof_hours_required, _ = unicode25.parse_input(f"{STATIC}/hard.txt")
+    bench(solucion_rota(rng, num_days, prof_hours_required), num_days, prof_hours_required)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Tiempo de validate_schedule de unicode-25 con horarios sintéticos de 10^5 clases.
+Ejecutar desde la raíz del repositorio: python benchmarks/unicode25_overlaps.py
+"""
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from validators import unicode25
+
+NUM_CLASSES = 100_000
+
+
+def horario_lleno(rng, num_days=20):
+    # Cada materia ocupa todas las horas de 8 a 20 de cada día, sin solapes
+    num_materias = NUM_CLASSES // (num_days * 12)
+    schedule = {}
+    for day in range(1, num_days + 1):
+        schedule[day] = [(rng.randrange(5000), materia, hour, hour + 1)
+                         for materia in range(num_materias) for hour in range(8, 20)]
+        rng.shuffle(schedule[day])
+    return num_days, schedule
+
+
+def horario_disperso(rng, num_days=10, num_materias=10):
+    # Pocas materias con muchas clases por día en un rango de horas amplio:
+    # casi todas fuera de horario (Regla 5) y algunos solapes (Regla 2)
+    per_day = NUM_CLASSES // num_days
+    schedule = {}
+    for day in range(1, num_days + 1):
+        classes = []
+        for _ in range(per_day):
+            start = rng.randrange(1_000_000)
+            classes.append((rng.randrange(5000), rng.randrange(num_materias), start, start + rng.randint(1, 3)))
+        schedule[day] = classes
+    return num_days, schedule
+
+
+def bench(name, num_days, schedule, repeat=3):
+    prof_hours_required = {}
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        errors = unicode25.validate_schedule(num_days, prof_hours_required, schedule)
+        best = min(best, time.perf_counter() - start)
+    regla2 = sum(error.startswith("Error Regla 2") for error in errors)
+    print(f"{name:10} {sum(map(len, schedule.values())):>7} clases  {regla2:>6} errores Regla 2  {best * 1000:9.1f} ms")
+
+
+def main():
+    rng = random.Random(25)
+    bench("lleno", *horario_lleno(rng))
+    bench("disperso", *horario_disperso(rng))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Tiempo y memoria de procesar una solución de unicode-25 entera como en el
+worker: leer el horario, validarlo y puntuarlo. También la memoria que
+ocupa el horario leído como tuplas y como columnas (ColumnarSchedule).
+Ejecutar desde la raíz del repositorio: python benchmarks/unicode25_pipeline.py
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(".")
+
+from validators import unicode25
+
+STATIC = "api/static/unicode-25"
+HOURS = [8, 9, 10, 12, 13, 14, 16, 17, 18]
+
+
+def solucion(rng, num_days, prof_hours_required, repeat=1):
+    # Clases de una hora en bloques de como mucho 3 horas seguidas por profesor
+    days = {day: [] for day in range(1, num_days + 1)}
+    free = {}
+    for _ in range(repeat):
+        for (prof, materia), hours in prof_hours_required.items():
+            for _ in range(hours):
+                day, k = free.get(prof, (1, 0))
+                days[day].append(f"{prof} {materia} {HOURS[k]} {HOURS[k] + 1}")
+                free[prof] = (day, k + 1) if k + 1 < len(HOURS) else (day % num_days + 1, 0)
+    lines = []
+    for day, classes in days.items():
+        rng.shuffle(classes)
+        lines += [f"{day} {len(classes)}"] + classes
+    return "\n".join(lines) + "\n"
+
+
+def por_pasadas(content, num_days, prof_hours_required, enrollments, engine):
+    # Horario como diccionario: validación y puntuación lo recorren por su cuenta
+    schedule, _ = unicode25.parse_output(content)
+    errors = unicode25.validate_schedule(num_days, prof_hours_required, schedule)
+    return errors, unicode25.calculate_score(enrollments, schedule, engine)
+
+
+def indexado(content, num_days, prof_hours_required, enrollments, engine):
+    # Como el worker: el índice de la lectura lo reutilizan las demás fases
+    index, _ = unicode25.parse_indexed(content)
+    errors = unicode25.validate_schedule(num_days, prof_hours_required, index)
+    return errors, unicode25.calculate_score(enrollments, index, engine)
+
+
+def columnas(content, num_days, prof_hours_required, enrollments, engine):
+    # Igual que indexado, con el horario en columnas array('i')
+    index, _ = unicode25.parse_indexed(content, columnar=True)
+    errors = unicode25.validate_schedule(num_days, prof_hours_required, index)
+    return errors, unicode25.calculate_score(enrollments, index, engine)
+
+
+def horario(content, columnar):
+    # Memoria que sigue ocupando el horario (sin índices) después de leerlo
+    tracemalloc.start()
+    schedule, _ = unicode25.parse_output(content, columnar)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def bench(name, content, num_days, prof_hours_required, enrollments, repeat=3):
+    for columnar in [False, True]:
+        print(f"{name:14} horario {'columnas' if columnar else 'tuplas':8} {horario(content, columnar) / 2**20:7.1f} MiB")
+    for pipeline, engine in [(por_pasadas, "python"), (indexado, "python"), (columnas, "python"), (indexado, "numpy"), (columnas, "numpy")]:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            errors, score = pipeline(content, num_days, prof_hours_required, enrollments, engine)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        pipeline(content, num_days, prof_hours_required, enrollments, engine)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:14} {pipeline.__name__:12} {engine:7} {content.count(chr(10)):>7} lineas  {len(errors):>6} errores  score {score:.4f}  {best * 1000:9.1f} ms  pico {peak / 2**20:7.1f} MiB")
+
+
+def main():
+    rng = random.Random(15)
+    num_days, prof_hours_required, enrollments = unicode25.parse_input(f"{STATIC}/hard.txt")
+    bench("hard.txt", solucion(rng, num_days, prof_hours_required), num_days, prof_hours_required, enrollments)
+    # Las horas de hard.txt repetidas hasta unas 10^5 clases en 80 veces más
+    # días, puntuadas para los 100 primeros alumnos
+    students = dict(list(enrollments.items())[:100])
+    bench("hard.txt x80", solucion(rng, 80 * num_days, prof_hours_required, 80), 80 * num_days, {}, students)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Tiempo de calculate_score de unicode-25 (con cada motor) con las matrículas de
+las entradas y un horario sintético que reparte las horas de cada profesor-materia.
+Ejecutar desde la raíz del repositorio: python benchmarks/unicode25_score.py
+"""
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from validators import unicode25
+
+STATIC = "api/static/unicode-25"
+
+
+def horario(rng, num_days, prof_hours_required):
+    # Bloques de 1 a 3 horas entre las 8 y las 20 en días aleatorios
+    schedule = {day: [] for day in range(1, num_days + 1)}
+    for (prof, materia), hours in prof_hours_required.items():
+        while hours > 0:
+            duration = min(hours, rng.randint(1, 3))
+            start = rng.randint(8, 20 - duration)
+            schedule[rng.randint(1, num_days)].append((prof, materia, start, start + duration))
+            hours -= duration
+    return schedule
+
+
+def bench(filename, repeat=3):
+    num_days, prof_hours_required, enrollments = unicode25.parse_input(f"{STATIC}/{filename}")
+    schedule = horario(random.Random(filename), num_days, prof_hours_required)
+    for engine in unicode25.SCORE_ENGINES:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            score = unicode25.calculate_score(enrollments, schedule, engine)
+            best = min(best, time.perf_counter() - start)
+        print(f"{filename:12} {engine:6} {len(enrollments):>6} alumnos  {sum(map(len, schedule.values())):>5} clases  score {score:.6f}  {best * 1000:9.1f} ms")
+
+
+def main():
+    for filename in ["easy.txt", "medium.txt", "hard.txt"]:
+        bench(filename)
+
+
+if __name__ == '__main__':
+    main()
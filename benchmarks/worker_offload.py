@@ -0,0 +1,82 @@
+"""
+Latencia de /health del worker mientras se valida y puntúa una solución de
+unicode-25 para hard.txt, con la validación en un hilo (VALIDATOR_PROCESSES=0) y en un pool
+de procesos.
+Ejecutar desde la raíz del repositorio: python benchmarks/worker_offload.py
+"""
+import sys
+import threading
+import time
+
+sys.path.append(".")
+
+from fastapi.testclient import TestClient
+
+from api import worker
+from validators import unicode25
+
+STATIC = "api/static/unicode-25"
+HOURS = [8, 9, 10, 12, 13, 14, 16, 17, 18]
+
+
+def solucion(num_days, prof_hours_required):
+    # Solución válida: clases de una hora en bloques de como mucho 3 horas
+    # seguidas por profesor, sin dos clases de la misma materia a la vez
+    days = {day: [] for day in range(1, num_days + 1)}
+    busy = set()
+    for (prof, materia), hours in prof_hours_required.items():
+        slots = ((day, hour) for day in days for hour in HOURS)
+        for day, hour in slots:
+            if hours == 0:
+                break
+            if (day, hour, "prof", prof) in busy or (day, hour, "materia", materia) in busy:
+                continue
+            busy.update([(day, hour, "prof", prof), (day, hour, "materia", materia)])
+            days[day].append(f"{prof} {materia} {hour} {hour + 1}")
+            hours -= 1
+    return "\n".join(f"{day} {len(classes)}\n" + "\n".join(classes) for day, classes in days.items()) + "\n"
+
+
+def bench(processes, body):
+    worker.pool.processes = processes
+    with TestClient(worker.app) as client:
+        done = threading.Event()
+        latencies = []
+
+        def validate():
+            start = time.perf_counter()
+            client.post("/validator/unicode-25", json=body)
+            latencies.append(time.perf_counter() - start)
+            done.set()
+
+        thread = threading.Thread(target=validate)
+        thread.start()
+        health = []
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/health")
+            health.append(time.perf_counter() - start)
+            time.sleep(0.01)
+        thread.join()
+    print(f"procesos {processes}  validación {latencies[0] * 1000:8.1f} ms  /health x{len(health):<4} máx {max(health) * 1000:7.1f} ms  media {sum(health) / len(health) * 1000:6.1f} ms")
+
+
+def main():
+    num_days, prof_hours_required, _ = unicode25.parse_input(f"{STATIC}/hard.txt")
+    content = solucion(num_days, prof_hours_required)
+    body = {
+        "event": "bench",
+        "title": "unicode-25",
+        "difficulty": "hard",
+        "points": 0,
+        "files": [{
+            "filename": "hard.txt", "type": "text/plain", "size": len(content), "languageId": 0, "content": content,
+            "tests": [{"id": 1, "visibility": "public"}],
+        }],
+    }
+    for processes in [0, 2]:
+        bench(processes, body)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Tiempo de parsear la petición y codificar la respuesta de un EventData con
+un content de 1, 10 y 50 MB: como lo hace FastAPI por defecto (json.loads y
+EventData.model_validate; jsonable_encoder y json.dumps) frente a
+api.worker.event_data (model_validate_json sobre los bytes) y event_dump con
+FastJSONResponse, con y sin lean.
+Ejecutar desde la raíz del repositorio: python benchmarks/worker_payloads.py
+"""
+import json
+import sys
+import time
+import warnings
+
+sys.path.append(".")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api import worker
+from models.req import EventData
+
+MB = 1 << 20
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def envio(size):
+    # Una pizza de one-pizza de size bytes, como la que devuelve el validador
+    # (el content y su copia en actual)
+    content = ("cheese peppers tomatoes " * (size // 24 + 1))[:size]
+    raw = json.dumps({
+        "event": "bench",
+        "title": "one-pizza",
+        "difficulty": "easy",
+        "points": 0,
+        "files": [{"filename": "e_elaborate.txt", "type": "text/plain", "size": size, "languageId": 0, "content": content, "tests": []}],
+    }).encode()
+    data = EventData.model_validate_json(raw)
+    data.files[0].tests.append({
+        "id": 1,
+        "input": {"file": {"name": "e_elaborate.txt", "path": "/static/one-pizza/e_elaborate.txt"}},
+        "actual": content,
+        "success": True,
+        "points": 1,
+    })
+    return raw, data
+
+
+def main():
+    warnings.simplefilter("ignore")
+    print(f"orjson {'instalado' if worker.orjson is not None else 'no instalado'}")
+    print(f"{'MB':>3} {'parse FastAPI':>14} {'event_data':>11} {'respuesta FastAPI':>18} {'event_dump':>11} {'lean':>9}")
+    for size in [1, 10, 50]:
+        raw, data = envio(size * MB)
+        parse_default = best_of(lambda: EventData.model_validate(json.loads(raw)))
+        parse_fast = best_of(lambda: EventData.model_validate_json(raw))
+        encode_default = best_of(lambda: JSONResponse(jsonable_encoder(data)))
+        encode_fast = best_of(lambda: worker.FastJSONResponse(jsonable_encoder(worker.event_dump(data))))
+        # En lean tampoco está la copia del content en actual
+        data.files[0].tests[0]["actual"] = None
+        encode_lean = best_of(lambda: worker.FastJSONResponse(jsonable_encoder(worker.event_dump(data, lean=True))))
+        print(f"{size:3} {parse_default * 1000:11.1f} ms {parse_fast * 1000:8.1f} ms {encode_default * 1000:15.1f} ms {encode_fast * 1000:8.1f} ms {encode_lean * 1000:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -54,3 +54,8 @@ class EventData(BaseModel):
     startDate: Optional[int] = None
     endDate: Optional[int] = None
     files: List[File]
+
+
+class PizzaBatch(BaseModel):
+    filename: str
+    contents: List[str]
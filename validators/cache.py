@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from validators.registry import validator
+
+onePizza = validator("one-pizza")
+unicode24 = validator("unicode-24")
+unicode25 = validator("unicode-25")
+
+
+def _load_one_pizza(path, level):
+    with open(path, 'r', encoding='utf-8') as f:
+        return onePizza.CompiledClients(*onePizza.parse_input_file(f.readlines()))
+
+
+def _load_unicode24(path, level):
+    return unicode24.MapConfig(path, level)
+
+
+def _load_unicode25(path, level):
+    return unicode25.parse_input(path)
+
+
+LOADERS = {
+    "one-pizza": _load_one_pizza,
+    "unicode-24": _load_unicode24,
+    "unicode-25": _load_unicode25,
+}
+
+
+class InputCache:
+    """
+    Process-wide LRU cache of parsed problem inputs.
+    Entries are keyed by (problem, filename, level, mtime) so editing a file
+    under the static directory invalidates its parsed version.
+    Cached values are shared between requests and must be treated as read-only.
+    With snapshots (a validators.snapshots.SnapshotStore), misses load the
+    precompiled snapshot of the file when it is up to date and parse the
+    text file otherwise.
+    """
+
+    def __init__(self, static_dir="api/static", maxsize=32, snapshots=None):
+        self.static_dir = static_dir
+        self.maxsize = maxsize
+        self.snapshots = snapshots
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, problem, filename):
+        return os.path.join(self.static_dir, problem, filename)
+
+    def get(self, problem, filename, level=None):
+        """
+        Return the parsed input for a static file, parsing it on a miss.
+        """
+        path = self.path(problem, filename)
+        key = (problem, filename, level, os.stat(path).st_mtime_ns)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = self.snapshots.load(problem, filename, level) if self.snapshots is not None else None
+        if value is None:
+            value = LOADERS[problem](path, level)
+
+        with self._lock:
+            # Drop versions of the same file parsed before it was modified
+            for stale in [k for k in self._entries if k[:3] == key[:3]]:
+                del self._entries[stale]
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def warm_up(self, spec):
+        """
+        Parse the inputs listed in spec ahead of the first request.
+        spec: comma separated "problem/filename[:level]" entries
+        """
+        for entry in filter(None, (e.strip() for e in spec.split(','))):
+            name, _, level = entry.partition(':')
+            problem, filename = name.split('/', 1)
+            self.get(problem, filename, int(level) if level else None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            **({"snapshots": self.snapshots.stats()} if self.snapshots is not None else {}),
+        }
+
+
+def content_digest(content):
+    """SHA-256 of a submission, as text or bytes."""
+    return hashlib.sha256(content.encode() if isinstance(content, str) else content).hexdigest()
+
+
+def _db_level(level):
+    """
+    Level of a key as stored in the SQLite table: -1 for problems without
+    levels (one-pizza), since NULLs in a primary key never conflict and
+    INSERT OR REPLACE would add a new row on every write.
+    """
+    return -1 if level is None else level
+
+
+class ResultCache:
+    """
+    LRU cache of validation results keyed by (problem, filename, level,
+    content digest), so a byte-identical resubmission is answered without
+    validating it again. Keys also carry the mtime of the static input file:
+    editing it makes the old results unreachable.
+    With db_path, results are also stored in a SQLite table that outlives
+    the process and is consulted on memory misses.
+    Values must be JSON serializable; tuples come back from disk as lists.
+    """
+
+    def __init__(self, static_dir="api/static", maxsize=1024, db_path=None):
+        self.static_dir = static_dir
+        self.maxsize = maxsize
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "problem TEXT, filename TEXT, level INTEGER NOT NULL, digest TEXT, mtime INTEGER, value TEXT, "
+                "PRIMARY KEY (problem, filename, level, digest))"
+            )
+            # Rows written with a NULL level by earlier versions, duplicated
+            # on every write and never read now
+            self._db.execute("DELETE FROM results WHERE level IS NULL")
+            self._db.commit()
+
+    def key(self, problem, filename, level, digest):
+        """
+        Key of a result, or None if the input file does not exist (the
+        validator reports that error itself).
+        """
+        try:
+            mtime = os.stat(os.path.join(self.static_dir, problem, filename)).st_mtime_ns
+        except OSError:
+            return None
+        return (problem, filename, level, digest, mtime)
+
+    @property
+    def on_disk(self):
+        """Whether get and put also use the SQLite table (and block on it)."""
+        return self._db is not None
+
+    def get(self, key):
+        if key is None or self.maxsize <= 0:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            value = self._get_disk(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key, value):
+        if key is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                problem, filename, level, digest, mtime = key
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                                 (problem, filename, _db_level(level), digest, mtime, json.dumps(value)))
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _get_disk(self, key):
+        if self._db is None:
+            return None
+        problem, filename, level, digest, mtime = key
+        row = self._db.execute(
+            "SELECT mtime, value FROM results WHERE problem = ? AND filename = ? AND level = ? AND digest = ?",
+            (problem, filename, _db_level(level), digest)).fetchone()
+        if row is None:
+            return None
+        if row[0] != mtime:
+            # Result for an older version of the input file
+            self._db.execute("DELETE FROM results WHERE problem = ? AND filename = ? AND mtime != ?",
+                             (problem, filename, mtime))
+            self._db.commit()
+            return None
+        return json.loads(row[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+        }
+
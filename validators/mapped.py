@@ -0,0 +1,128 @@
+import mmap
+import os
+
+import numpy as np
+
+# Bytes that separate numbers on top of the separators of each format
+WHITESPACE = b" \t\n\r\v\f"
+# Longest number that fits in an int64 without overflowing
+MAX_DIGITS = 18
+# Lines parsed at a time by int_line_blocks
+BLOCK_LINES = 1024
+
+
+class MappedText:
+    """
+    Read-only memory map of a text input file.
+    Lines are read one at a time like a file opened in text mode, or a block
+    at a time with the integers of every line parsed straight from the
+    mapped bytes, without decoding them into Python strings first.
+    The pages belong to the OS page cache, so processes loading the same file
+    share them instead of each reading its own copy.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            # mmap can't map an empty file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self.pos = 0
+        self._newlines = None
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # The traceback of a parse error still holds an array over the
+                # map: it is closed when both are collected
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def readline(self):
+        """
+        Next line with its newline ('' at the end of the file), with \\r\\n
+        translated to \\n as in text mode.
+        """
+        end = self._map.find(b"\n", self.pos)
+        end = len(self._map) if end < 0 else end + 1
+        line = self._map[self.pos:end].decode()
+        self.pos = end
+        return line[:-2] + "\n" if line.endswith("\r\n") else line
+
+    def newline_index(self):
+        """
+        Positions of every newline in the file, found in one pass the first
+        time they are needed so each int_lines only looks up its own lines.
+        """
+        if self._newlines is None:
+            self._newlines = np.flatnonzero(np.frombuffer(self._map, dtype=np.uint8) == ord("\n"))
+        return self._newlines
+
+    def int_lines(self, count, separators=b""):
+        """
+        Parse the next count lines (fewer at the end of the file), made of
+        non-negative integers separated by whitespace or any of the bytes in
+        separators.
+        Returns (values, offsets): int64 arrays where the numbers of line i
+        are values[offsets[i]:offsets[i + 1]].
+        Raises ValueError on any other byte, like int() would.
+        """
+        first = np.searchsorted(self.newline_index(), self.pos)
+        newlines = self._newlines[first:first + count] - self.pos
+        if count <= len(newlines):
+            end = self.pos + newlines[-1] + 1 if count else self.pos
+        else:
+            end = len(self._map)
+            if end > self.pos and self._map[end - 1] != ord("\n"):
+                # Last line without a newline
+                newlines = np.append(newlines, end - self.pos)
+        data = np.frombuffer(self._map, dtype=np.uint8, count=end - self.pos, offset=self.pos)
+        self.pos = int(end)
+
+        digit = (data >= ord("0")) & (data <= ord("9"))
+        allowed = np.zeros(256, dtype=bool)
+        allowed[list(WHITESPACE + separators)] = True
+        invalid = np.flatnonzero(~digit & ~allowed[data])
+        if len(invalid):
+            raise ValueError(f"invalid literal for int(): {bytes(data[invalid[0]:invalid[0] + 1])!r}")
+
+        # Each run of digits is a number: add up its digits left to right
+        bounds = np.flatnonzero(np.diff(digit, prepend=False, append=False))
+        starts, lengths = bounds[::2], bounds[1::2] - bounds[::2]
+        if len(lengths) and lengths.max() > MAX_DIGITS:
+            raise ValueError(f"number too long: more than {MAX_DIGITS} digits")
+        values = np.zeros(len(starts), dtype=np.int64)
+        for position in range(lengths.max(initial=0)):
+            more = np.flatnonzero(lengths > position)
+            values[more] = values[more] * 10 + (data[starts[more] + position] - ord("0"))
+
+        # Numbers that start before the end of each line
+        offsets = np.zeros(len(newlines) + 1, dtype=np.int64)
+        offsets[1:] = np.searchsorted(starts, newlines)
+        return values, offsets
+
+    def int_line_blocks(self, count, separators=b"", block=BLOCK_LINES):
+        """
+        int_lines of the next count lines in blocks of at most block lines,
+        so the temporary arrays stay small with long files.
+        """
+        while count > 0:
+            values, offsets = self.int_lines(min(count, block), separators)
+            if len(offsets) == 1:
+                return
+            count -= len(offsets) - 1
+            yield values, offsets
@@ -1,3 +1,8 @@
+from functools import cached_property
+
+import numpy as np
+
+
 def parse_input_file(file_lines):
   """
   Parse the input file and return the ingredients and clients.
@@ -62,3 +67,253 @@ def calculate_score(client_preferences, pizza):
       score += 1
 
   return score
+
+
+class CompiledClients:
+  """
+  Client preferences precompiled for fast scoring.
+  Ingredients are mapped to integer ids and the preferences of every client
+  are stored as a row of a clients x K table of ingredient ids (K being the
+  most likes + dislikes of any client), with a flag telling whether the
+  pizza must contain that ingredient (like) or not (dislike). Short rows are
+  padded with an extra ingredient id that no pizza ever contains, so a
+  padding entry is never violated. A pizza is then scored with a few
+  vectorized operations instead of building sets per client.
+  """
+
+  def __init__(self, ingredients, clients):
+    self.ingredients = ingredients
+    self.clients = clients
+    self.ingredient_ids = {item: i for i, item in enumerate(ingredients)}
+    self.num_clients = len(clients)
+
+    width = max((len(client["likes"]) + len(client["dislikes"]) for client in clients), default=0)
+    self.entry_ingredient = np.full((self.num_clients, width), len(ingredients), dtype=np.int32)
+    self.entry_is_like = np.zeros((self.num_clients, width), dtype=bool)
+    for c, client in enumerate(clients):
+      entries = client["likes"] + client["dislikes"]
+      self.entry_ingredient[c, :len(entries)] = [self.ingredient_ids[item] for item in entries]
+      self.entry_is_like[c, :len(client["likes"])] = True
+
+  @cached_property
+  def index(self):
+    """
+    Inverted ingredient index used for incremental scoring.
+    """
+
+    return IngredientIndex(self.ingredients, self.clients)
+
+  @cached_property
+  def clients(self):
+    """
+    Likes and dislikes of every client, rebuilt from the table when the
+    input was loaded with from_arrays.
+    """
+
+    padding = len(self.ingredients)
+    return [{
+      "likes": [self.ingredients[i] for i, like in zip(row, is_like) if like],
+      "dislikes": [self.ingredients[i] for i, like in zip(row, is_like) if not like and i != padding]
+    } for row, is_like in zip(self.entry_ingredient.tolist(), self.entry_is_like.tolist())]
+
+  def arrays(self):
+    """
+    The compiled input and its ingredient index as numpy arrays, to be
+    saved as a snapshot (see validators/snapshots.py).
+    """
+
+    return {
+      "ingredients": np.array(self.ingredients, dtype=str),
+      "entry_ingredient": self.entry_ingredient,
+      "entry_is_like": self.entry_is_like,
+      **self.index.arrays(self.ingredients),
+    }
+
+  @classmethod
+  def from_arrays(cls, arrays):
+    """
+    Rebuild a CompiledClients from arrays() without parsing the input or
+    building the ingredient index again.
+    """
+
+    compiled = cls.__new__(cls)
+    compiled.ingredients = arrays["ingredients"].tolist()
+    compiled.ingredient_ids = {item: i for i, item in enumerate(compiled.ingredients)}
+    compiled.entry_ingredient = arrays["entry_ingredient"]
+    compiled.entry_is_like = arrays["entry_is_like"]
+    compiled.num_clients = len(compiled.entry_ingredient)
+    compiled.index = IngredientIndex.from_arrays(compiled.ingredients, arrays)
+    return compiled
+
+  def ids_of(self, pizza):
+    """
+    Return the ids of the pizza ingredients that some client mentions.
+    Other ingredients can't change the score and are ignored.
+    """
+
+    return [i for i in map(self.ingredient_ids.get, pizza) if i is not None]
+
+  def encode(self, pizza):
+    """
+    Encode the pizza as a boolean vector indexed by ingredient id.
+    The last position is the padding ingredient and is always False.
+    """
+
+    vector = np.zeros(len(self.ingredients) + 1, dtype=bool)
+    vector[self.ids_of(pizza)] = True
+    return vector
+
+  def encode_many(self, pizzas):
+    """
+    Encode N pizzas as an N x (ingredients + 1) boolean matrix.
+    """
+
+    matrix = np.zeros((len(pizzas), len(self.ingredients) + 1), dtype=bool)
+    for row, pizza in enumerate(pizzas):
+      matrix[row, self.ids_of(pizza)] = True
+    return matrix
+
+  def score(self, pizza):
+    """
+    Calculate the score of the pizza, same result as calculate_score.
+    pizza: list of ingredients in the solution pizza
+    """
+
+    vector = self.encode(pizza)
+    unhappy = (vector[self.entry_ingredient] != self.entry_is_like).any(axis=1)
+    return self.num_clients - int(np.count_nonzero(unhappy))
+
+  def score_many(self, pizzas, chunk_size=256):
+    """
+    Calculate the score of N pizzas for the same input at once.
+    pizzas: list of pizzas, each one a list of ingredients
+    Returns a numpy array with one score per pizza.
+    """
+
+    matrix = self.encode_many(pizzas)
+    scores = np.empty(len(pizzas), dtype=np.int64)
+    for first in range(0, len(pizzas), chunk_size):
+      # ingredients x pizzas, so gathering the rows of an ingredient id is
+      # a contiguous copy
+      chunk = np.ascontiguousarray(matrix[first:first + chunk_size].T)
+      # unhappy[c, n] is True when pizza n violates any entry of client c
+      unhappy = np.zeros((self.num_clients, chunk.shape[1]), dtype=bool)
+      for k in range(self.entry_ingredient.shape[1]):
+        unhappy |= chunk[self.entry_ingredient[:, k]] != self.entry_is_like[:, k, None]
+      scores[first:first + chunk.shape[1]] = self.num_clients - np.count_nonzero(unhappy, axis=0)
+    return scores
+
+
+class IngredientIndex:
+  """
+  Inverted index from ingredient to the clients that like or dislike it,
+  built on parse_input_file's client list.
+  liked_by / disliked_by: ingredient -> numpy array of client ids
+  num_likes: number of distinct ingredients each client likes
+  """
+
+  def __init__(self, ingredients, clients):
+    self.num_clients = len(clients)
+    self.num_likes = np.array([len(set(client["likes"])) for client in clients], dtype=np.int32)
+    liked_by = {item: [] for item in ingredients}
+    disliked_by = {item: [] for item in ingredients}
+    for c, client in enumerate(clients):
+      for item in set(client["likes"]):
+        liked_by[item].append(c)
+      for item in set(client["dislikes"]):
+        disliked_by[item].append(c)
+    self.liked_by = {item: np.array(ids, dtype=np.int32) for item, ids in liked_by.items() if ids}
+    self.disliked_by = {item: np.array(ids, dtype=np.int32) for item, ids in disliked_by.items() if ids}
+
+  def arrays(self, ingredients):
+    """
+    The index as numpy arrays: the client ids of every ingredient, in the
+    order of ingredients, concatenated with their offsets.
+    """
+
+    arrays = {"num_likes": self.num_likes}
+    for name, postings in (("liked_by", self.liked_by), ("disliked_by", self.disliked_by)):
+      ids = [postings.get(item, np.empty(0, dtype=np.int32)) for item in ingredients]
+      arrays[name] = np.concatenate(ids) if ids else np.empty(0, dtype=np.int32)
+      arrays[f"{name}_offsets"] = np.cumsum([0] + [len(i) for i in ids])
+    return arrays
+
+  @classmethod
+  def from_arrays(cls, ingredients, arrays):
+    """
+    Rebuild the index from arrays(ingredients). The client ids of every
+    ingredient are views on the (possibly memory-mapped) arrays.
+    """
+
+    index = cls.__new__(cls)
+    index.num_likes = arrays["num_likes"]
+    index.num_clients = len(index.num_likes)
+    for name in ("liked_by", "disliked_by"):
+      ids, offsets = arrays[name], arrays[f"{name}_offsets"].tolist()
+      setattr(index, name, {item: ids[lo:hi] for item, lo, hi in zip(ingredients, offsets, offsets[1:]) if hi > lo})
+    return index
+
+
+class PizzaScore:
+  """
+  Score of a pizza kept up to date while ingredients are added or removed.
+  For every client it counts the liked ingredients in the pizza and the
+  disliked ones in it, so a change only touches the clients that mention
+  the changed ingredients.
+  """
+
+  def __init__(self, index, pizza):
+    self.index = index
+    self.pizza = set(pizza)
+    self.satisfied_likes = self._counts(index.liked_by)
+    self.violated_dislikes = self._counts(index.disliked_by)
+    self.score = int(np.count_nonzero(self._happy(slice(None))))
+
+  def _counts(self, postings):
+    clients = [postings[item] for item in self.pizza if item in postings]
+    if not clients:
+      return np.zeros(self.index.num_clients, dtype=np.int32)
+    return np.bincount(np.concatenate(clients), minlength=self.index.num_clients).astype(np.int32)
+
+  def changes(self, pizza):
+    """
+    Return the (added, removed) ingredients that turn this pizza into the given one.
+    """
+
+    pizza = set(pizza)
+    return pizza - self.pizza, self.pizza - pizza
+
+  def update(self, added=(), removed=()):
+    """
+    Apply a diff to the pizza and return the new score.
+    added: ingredients to put on the pizza
+    removed: ingredients to take off the pizza
+    """
+
+    for item in set(removed) & self.pizza:
+      self.pizza.remove(item)
+      self._count(item, -1)
+    for item in set(added) - self.pizza:
+      self.pizza.add(item)
+      self._count(item, 1)
+    return self.score
+
+  def _count(self, item, step):
+    likes = self.index.liked_by.get(item)
+    dislikes = self.index.disliked_by.get(item)
+    if likes is None and dislikes is None:
+      return
+    if likes is not None and dislikes is not None:
+      clients = np.union1d(likes, dislikes)
+    else:
+      clients = likes if dislikes is None else dislikes
+
+    before = int(np.count_nonzero(self._happy(clients)))
+    if likes is not None:
+      self.satisfied_likes[likes] += step
+    if dislikes is not None:
+      self.violated_dislikes[dislikes] += step
+    self.score += int(np.count_nonzero(self._happy(clients))) - before
+
+  def _happy(self, clients):
+    return (self.satisfied_likes[clients] == self.index.num_likes[clients]) & (self.violated_dislikes[clients] == 0)
@@ -0,0 +1,44 @@
+"""
+Registry of the validator modules by problem name. They (and numpy with
+them) are imported the first time they are used, so a new worker process
+only pays for the validators its requests need.
+"""
+import importlib
+import sys
+
+VALIDATORS = {
+    "one-pizza": "validators.onePizza",
+    "fibonacci": "validators.fibonacci",
+    "unicode-24": "validators.unicode24",
+    "unicode-25": "validators.unicode25",
+}
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used, which
+    imports it. The import lock of importlib makes the first use from
+    several threads at once safe.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{'' if self._module is None else ' (imported)'}>"
+
+
+def validator(problem):
+    """The validator module of a problem, imported on first use."""
+    return LazyModule(VALIDATORS[problem])
+
+
+def imported():
+    """Problems whose validator module has already been imported."""
+    return [problem for problem, name in VALIDATORS.items() if name in sys.modules]
@@ -0,0 +1,181 @@
+"""
+Precompiled binary snapshots of the parsed problem inputs, so a new worker
+process doesn't parse the text files under api/static again.
+Compile them with: python -m validators.snapshots [static_dir] [snapshot_dir]
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from validators.cache import LOADERS
+from validators.registry import LazyModule, validator
+
+# Imported on the first load or compile, not by the worker at startup
+np = LazyModule("numpy")
+onePizza = validator("one-pizza")
+unicode24 = validator("unicode-24")
+unicode25 = validator("unicode-25")
+
+# Bump when the arrays of any problem change: older snapshots are ignored
+VERSION = 1
+
+# problem -> (arrays of a parsed input, parsed input from its arrays at a level)
+CODECS = {
+    "one-pizza": (lambda value: value.arrays(), lambda arrays, level: onePizza.CompiledClients.from_arrays(arrays)),
+    "unicode-24": (lambda value: value.arrays(), lambda arrays, level: unicode24.MapConfig.from_arrays(arrays, level)),
+    "unicode-25": (lambda value: unicode25.input_arrays(*value), lambda arrays, level: unicode25.input_from_arrays(arrays)),
+}
+# Levels tried when compiling, highest first: a unicode-24 snapshot also
+# serves the levels below its own
+LEVELS = {
+    "one-pizza": [None],
+    "unicode-24": [3, 2, 1],
+    "unicode-25": [None],
+}
+
+
+def source_digest(path):
+    """SHA-256 of a source text file."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class MappedArrays(dict):
+    """
+    The arrays of a snapshot directory by name, each memory-mapped the first
+    time it is used. A missing array raises KeyError.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def __missing__(self, name):
+        try:
+            # A plain array over the map: slicing a np.memmap is much slower
+            array = np.asarray(np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r"))
+        except FileNotFoundError:
+            raise KeyError(name)
+        self[name] = array
+        return array
+
+
+class SnapshotStore:
+    """
+    Snapshots of parsed inputs, one directory per input file under
+    snapshot_dir/problem/filename: a .npy file per array and a meta.json
+    with the format version, the SHA-256 of the source text file and the
+    level it was parsed at.
+    Arrays are loaded memory-mapped and read-only, so processes loading the
+    same snapshot share its pages. A snapshot with another version or
+    checksum, or a lower level than requested, is stale: load returns None
+    and the caller parses the text file instead.
+    """
+
+    def __init__(self, snapshot_dir, static_dir="api/static"):
+        self.snapshot_dir = snapshot_dir
+        self.static_dir = static_dir
+        self.loads = 0
+        self.stale = 0
+        self.missing = 0
+
+    def path(self, problem, filename):
+        return os.path.join(self.snapshot_dir, problem, filename)
+
+    def load(self, problem, filename, level=None):
+        """
+        Return the parsed input from its snapshot, or None if there is no
+        snapshot or it is stale.
+        """
+        path = self.path(problem, filename)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            self.missing += 1
+            return None
+        except ValueError:
+            meta = {}
+
+        # Anything but a complete meta.json of this version is stale
+        if not isinstance(meta, dict):
+            meta = {}
+        compiled_level = meta.get("level")
+        if meta.get("version") != VERSION or \
+                meta.get("source_sha256") != source_digest(os.path.join(self.static_dir, problem, filename)) or \
+                (level is not None and not (isinstance(compiled_level, int) and level <= compiled_level)):
+            self.stale += 1
+            return None
+
+        try:
+            value = CODECS[problem][1](MappedArrays(path), level)
+        except (OSError, ValueError, KeyError):
+            # A broken snapshot (e.g. a missing or truncated array) is stale too
+            self.stale += 1
+            return None
+        self.loads += 1
+        return value
+
+    def compile(self, problem, filename):
+        """
+        Parse an input file and save its snapshot, at the highest level it
+        parses for unicode-24. Returns that level; parse errors propagate.
+        """
+        source = os.path.join(self.static_dir, problem, filename)
+        digest = source_digest(source)
+        error = None
+        for level in LEVELS[problem]:
+            try:
+                value = LOADERS[problem](source, level)
+                break
+            except Exception as e:
+                error = error or e
+        else:
+            raise error
+
+        # Written next to the final directory and moved into place at once
+        os.makedirs(os.path.join(self.snapshot_dir, problem), exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=os.path.join(self.snapshot_dir, problem))
+        for name, array in CODECS[problem][0](value).items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "source_sha256": digest, "level": level}, f)
+        target = self.path(problem, filename)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        return level
+
+    def compile_all(self):
+        """
+        Compile every file of every problem in static_dir, yielding
+        (problem, filename, level or the parse error).
+        """
+        for problem in CODECS:
+            for filename in sorted(os.listdir(os.path.join(self.static_dir, problem))):
+                try:
+                    yield problem, filename, self.compile(problem, filename)
+                except Exception as e:
+                    yield problem, filename, e
+
+    def stats(self):
+        return {
+            "loads": self.loads,
+            "stale": self.stale,
+            "missing": self.missing,
+        }
+
+
+def main(static_dir="api/static", snapshot_dir="api/snapshots"):
+    store = SnapshotStore(snapshot_dir, static_dir)
+    for problem, filename, level in store.compile_all():
+        if isinstance(level, Exception):
+            print(f"{problem}/{filename}: skipped ({type(level).__name__}: {level})")
+        else:
+            print(f"{problem}/{filename}: ok" + (f" (level {level})" if level is not None else ""))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append("../../..")
+
+from validators.cache import ResultCache
+
+STATIC = "../../../api/static"
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as db:
+        return db.execute("SELECT problem, filename, level, value FROM results").fetchall()
+
+
+def test_disk_key(tmp):
+    # The same key written twice keeps a single row, also without a level
+    db_path = os.path.join(tmp, "results.db")
+    cache = ResultCache(STATIC, 4, db_path)
+    pizza = cache.key("one-pizza", "a_an_example.txt", None, "digest")
+    cache.put(pizza, 2)
+    cache.put(pizza, 3)
+    assert rows(db_path) == [("one-pizza", "a_an_example.txt", -1, "3")], rows(db_path)
+    unicode24 = cache.key("unicode-24", "crazy_easy_dataset.txt", 1, "digest")
+    cache.put(unicode24, ["ok", 1])
+    cache.put(unicode24, ["ok", 2])
+    assert len(rows(db_path)) == 2
+
+    # Read back from disk by a new process
+    cache = ResultCache(STATIC, 4, db_path)
+    assert cache.get(pizza) == 3 and cache.get(unicode24) == ["ok", 2]
+    assert cache.stats()["disk_hits"] == 2
+    print("Test test_disk_key: OK")
+
+
+def test_old_rows(tmp):
+    # Rows with a NULL level from earlier versions are dropped on open
+    db_path = os.path.join(tmp, "old.db")
+    with sqlite3.connect(db_path) as db:
+        db.execute("CREATE TABLE results (problem TEXT, filename TEXT, level INTEGER, digest TEXT, mtime INTEGER, value TEXT, "
+                   "PRIMARY KEY (problem, filename, level, digest))")
+        db.executemany("INSERT OR REPLACE INTO results VALUES ('one-pizza', 'a_an_example.txt', NULL, 'digest', 0, ?)", [("1",), ("2",)])
+    assert len(rows(db_path)) == 2
+    ResultCache(STATIC, 4, db_path)
+    assert rows(db_path) == []
+    print("Test test_old_rows: OK")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        test_disk_key(tmp)
+        test_old_rows(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+import time
+
+# The worker finds api/static from the repository root
+os.chdir("../../..")
+sys.path.append(".")
+os.environ.setdefault("API_URL", "http://localhost:3000")
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api import jobs, worker
+
+
+def fibonacci_body(actual):
+    return {"event": "test", "title": "fibonacci", "difficulty": "easy", "points": 0, "files": [{
+        "filename": "fib.py", "type": "text/plain", "size": 0, "languageId": 0, "content": "print(1)",
+        "tests": [{"id": 1, "visibility": "public", "actual": actual, "output": {"stdout": actual}}]}]}
+
+
+def wait(client, job_id):
+    for _ in range(200):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] != "pending":
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still pending")
+
+
+def test_tests_in_key(client):
+    # Same files, different tests: each submission gets its own job
+    good = client.post("/validator/fibonacci/jobs", json=fibonacci_body("1, 1, 2, 3")).json()
+    bad = client.post("/validator/fibonacci/jobs", json=fibonacci_body("1, 2, 4, 9")).json()
+    assert good["id"] != bad["id"] and not bad["reused"]
+    assert wait(client, good["id"])["result"]["files"][0]["tests"][0]["success"] is True
+    assert wait(client, bad["id"])["result"]["files"][0]["tests"][0]["success"] is False
+    again = client.post("/validator/fibonacci/jobs", json=fibonacci_body("1, 2, 4, 9")).json()
+    assert again["id"] == bad["id"] and again["reused"]
+    print("Test test_tests_in_key: OK")
+
+
+async def slow_validator(data, lean):
+    await worker.pool.run(time.sleep, 0.2)
+    return {"title": data.title}
+
+
+async def submit_burst(count):
+    # All the submissions reach the event loop before any job starts
+    transport = httpx.ASGITransport(app=worker.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.post("/validator/slow/jobs", json={**fibonacci_body(str(i)), "title": "slow"})
+                                           for i in range(count)))
+        await asyncio.gather(*worker.job_tasks)
+        return [(response.status_code, response.json()) for response in responses]
+
+
+def test_burst():
+    # Submissions over the pool limit are rejected when submitted: the
+    # accepted ones all run
+    worker.JOB_VALIDATORS["slow"] = slow_validator
+    max_pending = worker.pool.max_pending
+    worker.pool.max_pending = 2
+    try:
+        responses = asyncio.run(submit_burst(5))
+    finally:
+        worker.pool.max_pending = max_pending
+        del worker.JOB_VALIDATORS["slow"]
+    accepted = [body["id"] for status, body in responses if status == 202]
+    assert len(accepted) == 2 and [status for status, _ in responses].count(429) == 3, responses
+    assert all(worker.jobs.get(job_id).status == jobs.DONE for job_id in accepted)
+    assert worker.pool.reserved == 0 and worker.pool.pending == 0
+    print("Test test_burst: OK")
+
+
+def test_failed_not_reused():
+    # A job that failed (e.g. 429 or 504) is not the job of its submission any more
+    store = jobs.JobStore()
+    job = store.add("unicode-24", "key")
+    store.finish(job, error={"status": 504, "detail": "Gateway Timeout"})
+    assert store.find("key") is None
+    again = store.add("unicode-24", "key")
+    store.finish(job, error={"status": 504, "detail": "Gateway Timeout"})
+    assert store.find("key") is again
+    print("Test test_failed_not_reused: OK")
+
+
+def main():
+    with TestClient(worker.app) as client:
+        test_tests_in_key(client)
+    test_burst()
+    test_failed_not_reused()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import random
+import sys
+
+sys.path.append("../..")
+
+from onePizza import CompiledClients, PizzaScore, calculate_score, parse_input_file, parse_output_file
+
+STATIC = "../../../api/static/one-pizza"
+FILES = ["a_an_example.txt", "b_basic.txt", "c_coarse.txt", "d_difficult.txt", "e_elaborate.txt"]
+
+
+def load(filename):
+  with open(f"{STATIC}/{filename}", "r", encoding="utf-8") as file:
+    return parse_input_file(file.readlines())
+
+
+def random_pizzas(ingredients, rng, count):
+  ingredients = sorted(ingredients)
+  for _ in range(count):
+    pizza = rng.sample(ingredients, rng.randint(0, len(ingredients)))
+    yield parse_output_file(f"{len(pizza)} " + " ".join(pizza + ["not_an_ingredient"]))
+
+
+def test_compiled_score(filename):
+  rng = random.Random(filename)
+  ingredients, clients = load(filename)
+  compiled = CompiledClients(ingredients, clients)
+  for pizza in random_pizzas(ingredients, rng, 5):
+    expected = calculate_score(clients, pizza)
+    assert compiled.score(pizza) == expected, (filename, expected)
+  print(f"Test test_compiled_score {filename}: OK")
+
+
+def test_score_many(filename):
+  rng = random.Random(filename)
+  compiled = CompiledClients(*load(filename))
+  pizzas = list(random_pizzas(compiled.ingredients, rng, 50))
+  expected = [compiled.score(pizza) for pizza in pizzas]
+  assert compiled.score_many(pizzas, chunk_size=16).tolist() == expected, filename
+  print(f"Test test_score_many {filename}: OK")
+
+
+def test_delta_score(filename):
+  rng = random.Random(filename)
+  compiled = CompiledClients(*load(filename))
+  ingredients = sorted(compiled.ingredients)
+  pizza = set(next(random_pizzas(ingredients, rng, 1)))
+  state = PizzaScore(compiled.index, pizza)
+  for _ in range(50):
+    for item in rng.sample(ingredients, min(3, len(ingredients))):
+      pizza ^= {item}
+    added, removed = state.changes(pizza)
+    assert state.update(added, removed) == compiled.score(pizza), filename
+  print(f"Test test_delta_score {filename}: OK")
+
+
+def test_example():
+  compiled = CompiledClients(*load("a_an_example.txt"))
+  assert compiled.score(parse_output_file("4 cheese mushrooms tomatoes peppers")) == 2
+  assert compiled.score(parse_output_file("3 cheese peppers basil")) == 2
+  print("Test test_example: OK")
+
+
+def main():
+  test_example()
+  for filename in FILES:
+    test_compiled_score(filename)
+    test_score_many(filename)
+    test_delta_score(filename)
+
+
+if __name__ == '__main__':
+  main()
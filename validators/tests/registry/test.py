@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+sys.path.append("../../..")
+
+from validators import registry
+
+ROOT = "../../.."
+
+
+def modules_after(code):
+    # sys.modules of a new interpreter after running code from the repository root
+    env = {**os.environ, "API_URL": "http://localhost:3000"}
+    result = subprocess.run([sys.executable, "-c", f"import json, sys\n{code}\nprint(json.dumps(sorted(sys.modules)))"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_startup():
+    for code in ["import validators.cache", "import validators.snapshots", "import api.tasks", "import api.worker"]:
+        modules = modules_after(code)
+        eager = [name for name in ["numpy", *registry.VALIDATORS.values()] if name in modules]
+        assert not eager, (code, eager)
+    print("Test test_startup: OK")
+
+
+def test_first_use():
+    # Only the validator that is used gets imported
+    modules = modules_after("from api import tasks\ntasks.unicode25_max_errors()")
+    assert "validators.unicode25" in modules and "numpy" in modules
+    assert "validators.onePizza" not in modules and "validators.unicode24" not in modules
+    print("Test test_first_use: OK")
+
+
+def test_threads():
+    # The first use from several threads at once sees the whole module
+    module = registry.LazyModule("validators.unicode24")
+    barrier = threading.Barrier(8)
+    found = []
+
+    def use():
+        barrier.wait()
+        found.append(module.MapConfig.ROUTE_CHUNK)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(found) == 8 and len(set(found)) == 1
+    assert "unicode-24" in registry.imported()
+    print("Test test_threads: OK")
+
+
+def main():
+    test_startup()
+    test_first_use()
+    test_threads()
+
+
+if __name__ == '__main__':
+    main()
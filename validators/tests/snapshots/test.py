@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append("../../..")
+
+from validators import snapshots
+from validators.cache import InputCache, LOADERS
+from validators.snapshots import SnapshotStore
+
+STATIC = "../../../api/static"
+INPUTS = {
+    "one-pizza": ["a_an_example.txt", "b_basic.txt", "c_coarse.txt", "d_difficult.txt"],
+    "unicode-24": ["small_hard_dataset.txt", "medium_hard_dataset.txt", "big_hard_dataset.txt", "crazy_easy_dataset.txt"],
+    "unicode-25": ["dummy.txt", "easy.txt", "medium.txt"],
+}
+
+
+def state(problem, value):
+    # Everything a validation reads from a parsed input
+    if problem == "one-pizza":
+        # By ingredient name: the ids depend on the order the text was parsed in
+        index = value.index
+        clients = [(sorted(client["likes"]), sorted(client["dislikes"])) for client in value.clients]
+        likes = {item: index.liked_by[item].tolist() for item in index.liked_by}
+        dislikes = {item: index.disliked_by[item].tolist() for item in index.disliked_by}
+        return sorted(value.ingredients), clients, index.num_likes.tolist(), likes, dislikes
+    if problem == "unicode-24":
+        return (value.level, value.dim, value.initial_pos, value.delivery_points, value.walls.rows, value.walls.cols,
+                value.walls.row_keys, value.walls.col_keys, value.tunnels, value.tunnel_rows, value.tunnel_cols,
+                getattr(value, "drones", None), getattr(value, "drone_cells", None), getattr(value, "drifting_drones", None))
+    return value
+
+
+def test_round_trip(store):
+    for problem, filenames in INPUTS.items():
+        for filename in filenames:
+            level = store.compile(problem, filename)
+            for level in ([level] if level is None else range(1, level + 1)):
+                value = store.load(problem, filename, level)
+                assert value is not None, (problem, filename, level)
+                parsed = LOADERS[problem](f"{STATIC}/{problem}/{filename}", level)
+                assert state(problem, value) == state(problem, parsed), (problem, filename, level)
+    print("Test test_round_trip: OK")
+
+
+def test_pizza_score(store):
+    for filename in INPUTS["one-pizza"]:
+        parsed = LOADERS["one-pizza"](f"{STATIC}/one-pizza/{filename}", None)
+        value = store.load("one-pizza", filename)
+        for pizza in [[], parsed.ingredients, parsed.ingredients[::2], parsed.ingredients[1::3]]:
+            assert value.score(pizza) == parsed.score(pizza), filename
+    print("Test test_pizza_score: OK")
+
+
+def test_stale(store, static_dir):
+    store.compile("unicode-25", "dummy.txt")
+    store.compile("unicode-24", "crazy_easy_dataset.txt")
+    path = store.path("unicode-25", "dummy.txt")
+
+    # Levels above the one the snapshot was compiled at
+    assert store.load("unicode-24", "crazy_easy_dataset.txt", 1) is not None
+    assert store.load("unicode-24", "crazy_easy_dataset.txt", 2) is None
+
+    # Another format version
+    snapshots.VERSION += 1
+    assert store.load("unicode-25", "dummy.txt") is None
+    snapshots.VERSION -= 1
+    assert store.load("unicode-25", "dummy.txt") is not None
+
+    # A missing array or an unreadable meta.json
+    os.remove(os.path.join(path, "enrollments.npy"))
+    assert store.load("unicode-25", "dummy.txt") is None
+    store.compile("unicode-25", "dummy.txt")
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        f.write("{")
+    assert store.load("unicode-25", "dummy.txt") is None
+
+    # A meta.json that isn't an object or lacks some key
+    for meta in [[], {"version": snapshots.VERSION}]:
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        assert store.load("unicode-25", "dummy.txt") is None
+    level_path = store.path("unicode-24", "crazy_easy_dataset.txt")
+    with open(os.path.join(level_path, "meta.json")) as f:
+        meta = json.load(f)
+    del meta["level"]
+    with open(os.path.join(level_path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    assert store.load("unicode-24", "crazy_easy_dataset.txt", 1) is None
+
+    # The source text edited after compiling
+    store.compile("unicode-25", "dummy.txt")
+    with open(os.path.join(static_dir, "unicode-25", "dummy.txt"), "a") as f:
+        f.write("\n")
+    assert store.load("unicode-25", "dummy.txt") is None
+    with open(os.path.join(path, "meta.json")) as f:
+        assert json.load(f)["source_sha256"] != snapshots.source_digest(os.path.join(static_dir, "unicode-25", "dummy.txt"))
+    print("Test test_stale: OK")
+
+
+def test_cache(store, static_dir):
+    # A stale snapshot falls back to the text file, an up to date one is loaded
+    inputs = InputCache(static_dir, snapshots=store)
+    parsed = inputs.get("unicode-25", "dummy.txt")
+    assert parsed == LOADERS["unicode-25"](os.path.join(static_dir, "unicode-25", "dummy.txt"), None)
+    stale = store.stale
+    store.compile("unicode-25", "dummy.txt")
+    assert InputCache(static_dir, snapshots=store).get("unicode-25", "dummy.txt") == parsed
+    assert store.stale == stale and inputs.stats()["snapshots"]["loads"] > 0
+    print("Test test_cache: OK")
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        static_dir = os.path.join(tmp, "static")
+        for problem, filenames in INPUTS.items():
+            os.makedirs(os.path.join(static_dir, problem))
+            for filename in filenames:
+                shutil.copy(f"{STATIC}/{problem}/{filename}", os.path.join(static_dir, problem))
+        store = SnapshotStore(os.path.join(tmp, "snapshots"), static_dir)
+        test_round_trip(store)
+        test_pizza_score(store)
+        test_stale(store, static_dir)
+        test_cache(store, static_dir)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import glob
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode24 import DroneClock, MapConfig
+
+DATASETS = sorted(glob.glob("../../../../api/static/unicode-24/*_hard_dataset.txt"))
+STEPS = 3000
+
+
+def simulate(config, drone, steps):
+  # Step by step positions (and move taken from each one), wrapping around the map
+  col, row = config.unpack(drone["origin"])
+  positions, movs = [(col, row)], []
+  for t in range(steps):
+    col_mov, row_mov = config.movs[drone["movs"][t % drone["total_movs"]]]
+    col, row = (col + col_mov) % config.dim[0], (row + row_mov) % config.dim[1]
+    positions.append((col, row))
+    movs.append((col_mov, row_mov))
+  return positions, movs
+
+
+def collides(prev_pos, next_pos, mov, pos, same_col, same_row):
+  # Collision rule of the step by step validator
+  if (mov[0] == 0 and same_col) or (mov[1] == 0 and same_row):
+    return pos in (prev_pos, next_pos)
+  return pos == next_pos
+
+
+def test_drone_at(path, config, rng):
+  trajectories = [simulate(config, drone, STEPS) for drone in config.drones]
+  for t in range(1, STEPS + 1):
+    # Cells around some drone plus a random one
+    positions, _ = rng.choice(trajectories)
+    col, row = positions[t]
+    candidates = [(col, row), positions[t-1], ((col+1) % config.dim[0], row), (col, (row+1) % config.dim[1]),
+                  (rng.randrange(config.dim[0]), rng.randrange(config.dim[1]))]
+    for pos in candidates:
+      same_col, same_row = rng.random() < 0.5, rng.random() < 0.5
+      expected = any(collides(p[t-1], p[t], m[t-1], pos, same_col, same_row) for p, m in trajectories)
+      clock = DroneClock(t - 1)
+      assert config.drone_at(config.pack(pos), same_col, same_row, clock) == expected, (path, t, pos)
+      assert clock.t == t
+  print(f"Test test_drone_at {path}: OK")
+
+
+def test_drifting(path, config, rng):
+  # Drones that don't come back to their origin wrap around the map
+  config.drones.append({"origin": config.pack((config.dim[0] - 2, 1)), "movs": ">>-", "total_movs": 3})
+  config.drones.append({"origin": config.pack((3, 0)), "movs": "+<", "total_movs": 2})
+  config.index_drones()
+  assert len(config.drifting_drones) == 2, path
+  test_drone_at(path, config, rng)
+
+
+def main():
+  rng = random.Random(24)
+  for path in DATASETS:
+    config = MapConfig(path, 3)
+    test_drone_at(path, config, rng)
+  test_drifting(DATASETS[-1], MapConfig(DATASETS[-1], 3), rng)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,51 @@
+import glob
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode24 import ENGINES, MapConfig, validate_output
+
+MEDIO = "../medio"
+DATASETS = sorted(glob.glob("../../../../api/static/unicode-24/*_dataset.txt"))
+
+
+def test_medio_files():
+  # Every engine gives the same verdict on the medio test files
+  for input_file, level in [("input_medio.txt", 2), ("input_dificil.txt", 3)]:
+    config = MapConfig(f"{MEDIO}/{input_file}", level)
+    for path in sorted(glob.glob(f"{MEDIO}/*.txt")):
+      if path.split("/")[-1].startswith("input_"):
+        continue
+      with open(path, "r") as file:
+        content = file.read()
+      results = {engine: validate_output(config, content, engine) for engine in ENGINES}
+      assert len(set(results.values())) == 1, (input_file, path, results)
+  print("Test test_medio_files: OK")
+
+
+def random_route(rng, config):
+  origin = (rng.randrange(-1, config.dim[0] + 1), rng.randrange(-1, config.dim[1] + 1))
+  movs = "".join(f"{rng.choice([1, 1, 2, 5, 50, 500])}{rng.choice('><-+')}" for _ in range(rng.randint(1, 40)))
+  return origin, movs
+
+
+def test_random_routes(path, level, rng):
+  configs = {engine: MapConfig(path, level) for engine in ENGINES}
+  for _ in range(200):
+    origin, movs = random_route(rng, configs["step"])
+    results = {engine: traverse_path(configs[engine], origin, movs) for engine, traverse_path in ENGINES.items()}
+    assert len(set(results.values())) == 1, (path, level, origin, movs, results)
+  print(f"Test test_random_routes {path} level {level}: OK")
+
+
+def main():
+  test_medio_files()
+  rng = random.Random(24)
+  for path in DATASETS:
+    level = {"easy": 1, "medium": 2, "hard": 3}[path.split("_")[-2]]
+    test_random_routes(path, level, rng)
+
+
+if __name__ == '__main__':
+  main()
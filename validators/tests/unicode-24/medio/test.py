@@ -1,8 +1,9 @@
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append("../../..")
 
-from unicode24 import MapConfig, validate_output
+from unicode24 import ENGINES, MapConfig, validate_output
 
 
 def test_bad_route(config):
@@ -85,6 +86,22 @@ def test_drone_crash(config):
     assert err == f"Your drone collided with another drone at {expected_crash} (Nobody was hurt ;)", err
   print("Test drone_crash: OK")
 
+def test_drone_crash_threads(config):
+  # Validations running at the same time on one cached config don't share
+  # the drones' clock
+  expected_crash = (40, 0)
+  with open("drone_crash.txt", "r") as file:
+    content = file.read()
+  interval = sys.getswitchinterval()
+  sys.setswitchinterval(1e-6)
+  try:
+    with ThreadPoolExecutor(16) as pool:
+      errors = list(pool.map(lambda i: validate_output(config, content, list(ENGINES)[i % len(ENGINES)])[1], range(400)))
+  finally:
+    sys.setswitchinterval(interval)
+  assert set(errors) == {f"Your drone collided with another drone at {expected_crash} (Nobody was hurt ;)"}, set(errors)
+  print("Test drone_crash_threads: OK")
+
 def main():
   config = MapConfig("input_medio.txt", 2) 
   test_bad_route(config)
@@ -99,6 +116,7 @@ def main():
   good(config)
   config = MapConfig("input_dificil.txt", 3)
   test_drone_crash(config)
+  test_drone_crash_threads(config)
 
 
 if __name__ == '__main__':
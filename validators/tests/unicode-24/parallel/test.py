@@ -0,0 +1,115 @@
+import glob
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append("../../..")
+
+import unicode24
+from unicode24 import MapConfig, validate_output
+
+MEDIO = "../medio"
+
+
+def test_medio_files():
+  # Same verdict with and without the pool on the medio test files
+  config = MapConfig(f"{MEDIO}/input_medio.txt", 2)
+  for path in sorted(glob.glob(f"{MEDIO}/*.txt")):
+    if path.split("/")[-1].startswith("input_"):
+      continue
+    with open(path, "r") as file:
+      content = file.read()
+    assert validate_output(config, content, processes=3) == validate_output(config, content), path
+  print("Test test_medio_files: OK")
+
+
+def test_first_error(rng):
+  # Several wrong routes spread over many blocks: the first one in file order is reported
+  config = MapConfig(f"{MEDIO}/input_medio.txt", 2)
+  with open(f"{MEDIO}/good.txt", "r") as file:
+    lines = file.read().split("\n")
+  routes = [line for line in lines[1:] if line.strip()]
+  wrong = ["2;40,25;10<6-", "4;28,30;500>", "1;30,30;3<", "x;1,1;1>", "99;1,1;1>"]
+  for _ in range(20):
+    content = [lines[0]] + routes * rng.randint(1, 40)
+    for route in rng.sample(wrong, rng.randint(1, len(wrong))):
+      content.insert(rng.randrange(1, len(content) + 1), route)
+    serial = parallel = None
+    try:
+      serial = validate_output(config, "\n".join(content))
+    except Exception as e:
+      serial = type(e)
+    try:
+      parallel = validate_output(config, "\n".join(content), processes=4)
+    except Exception as e:
+      parallel = type(e)
+    assert serial == parallel, (serial, parallel)
+  print("Test test_first_error: OK")
+
+
+def test_bounded_reading():
+  # A wrong route early in a long stream: the lines are read a few blocks
+  # ahead of the error, not to the end, and the pool is reused
+  config = MapConfig(f"{MEDIO}/input_medio.txt", 2)
+  with open(f"{MEDIO}/good.txt", "r") as file:
+    lines = file.read().split("\n")
+  routes = [line for line in lines[1:] if line.strip()]
+  content = [lines[0], routes[0], "4;28,30;500>"] + routes * 200
+  read = 0
+
+  def stream():
+    nonlocal read
+    for line in content:
+      read += 1
+      yield line
+
+  expected = validate_output(config, "\n".join(content))
+  assert validate_output(config, stream(), processes=2) == expected
+  ahead = (2 * unicode24.TASKS_PER_PROCESS + 1) * unicode24.ROUTES_PER_TASK
+  assert read <= 1 + ahead, (read, len(content))
+  pool = unicode24._route_pool[3]
+  assert validate_output(config, "\n".join(content), processes=2) == expected
+  assert unicode24._route_pool[3] is pool
+  print("Test test_bounded_reading: OK")
+
+
+def test_threads():
+  # Validations running at the same time in threads, on two maps (walls only
+  # at level 2), each get the verdict of their own map. They don't fork from
+  # the threads: the pool is only used from a single-threaded process
+  configs = [MapConfig(f"{MEDIO}/input_medio.txt", 2), MapConfig(f"{MEDIO}/input_medio.txt", 1)]
+  contents = []
+  for name in ["wall.txt", "good.txt"]:
+    with open(f"{MEDIO}/{name}", "r") as file:
+      contents.append(file.read())
+  cases = [(config, content) for config in configs for content in contents]
+  expected = [validate_output(config, content) for config, content in cases]
+  assert expected[0] != expected[2]
+  pools = []
+  check_routes_parallel = unicode24.check_routes_parallel
+  def counted(*args):
+    pools.append(args)
+    return check_routes_parallel(*args)
+  unicode24.check_routes_parallel = counted
+  try:
+    with ThreadPoolExecutor(8) as pool:
+      results = list(pool.map(lambda i: validate_output(*cases[i % len(cases)], processes=2), range(40)))
+    assert results == [expected[i % len(cases)] for i in range(40)], results
+    assert pools == []
+    assert [validate_output(config, content, processes=2) for config, content in cases] == expected
+    assert len(pools) == len(cases)
+  finally:
+    unicode24.check_routes_parallel = check_routes_parallel
+  print("Test test_threads: OK")
+
+
+def main():
+  unicode24.ROUTES_PER_TASK = 3
+  test_medio_files()
+  test_first_error(random.Random(11))
+  test_bounded_reading()
+  test_threads()
+
+
+if __name__ == '__main__':
+  main()
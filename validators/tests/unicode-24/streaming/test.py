@@ -0,0 +1,49 @@
+import glob
+import io
+import re
+import sys
+
+sys.path.append("../../..")
+
+from unicode24 import MapConfig, validate_output
+
+MEDIO = "../medio"
+
+
+def test_file_like():
+  # Same verdict for the whole string, a text file and a list of lines
+  for input_file, level in [("input_medio.txt", 2), ("input_dificil.txt", 3)]:
+    config = MapConfig(f"{MEDIO}/{input_file}", level)
+    for path in sorted(glob.glob(f"{MEDIO}/*.txt")):
+      if path.split("/")[-1].startswith("input_"):
+        continue
+      with open(path, "r", newline="\n") as file:
+        content = file.read()
+        file.seek(0)
+        streamed = validate_output(config, file)
+      assert streamed == validate_output(config, content), (input_file, path)
+      assert validate_output(config, content.split("\n")) == validate_output(config, content), (input_file, path)
+      crlf = content.replace("\n", "\r\n")
+      assert validate_output(config, io.StringIO(crlf, newline="\n")) == validate_output(config, crlf), (input_file, path)
+  print("Test test_file_like: OK")
+
+
+def test_repeated_points():
+  # Visiting a point twice doesn't count as visiting another one
+  config = MapConfig(f"{MEDIO}/input_medio.txt", 2)
+  with open(f"{MEDIO}/good.txt", "r") as file:
+    routes = [line for line in file.read().split("\n")[1:] if line.strip()]
+  routes = routes[:-1] + routes[1:2]
+  total_movs = sum(int(mov[:-1]) for route in routes for mov in re.findall(r'\d+[><+-]', route.split(";")[2]))
+  _, err = validate_output(config, [str(total_movs)] + routes)
+  assert err == "Drone doesn't visit all of the delivery points", err
+  print("Test test_repeated_points: OK")
+
+
+def main():
+  test_file_like()
+  test_repeated_points()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,90 @@
+import glob
+import random
+import sys
+
+sys.path.append("../../..")
+
+from mapped import MappedText
+from unicode24 import MapConfig, WallIndex
+
+DATASETS = sorted(glob.glob("../../../../api/static/unicode-24/*_medium_dataset.txt") +
+                  glob.glob("../../../../api/static/unicode-24/*_hard_dataset.txt"))
+
+
+def read_walls(path):
+  config = MapConfig(path, 1)
+  with MappedText(path) as reader:
+    next(reader)
+    next(reader)
+    config.read_points(reader)
+    return config.read_walls_or_tunnels(reader)
+
+
+def exploded_walls(walls):
+  # Every cell covered by a wall, as MapConfig used to store them
+  cells = []
+  for wall in walls:
+    if wall["init"][0] == wall["end"][0]: # Vertical wall
+      cells += [(wall["init"][0], y) for y in range(wall["init"][1], wall["end"][1]+1)]
+    else: # Horizontal wall
+      cells += [(x, wall["init"][1]) for x in range(wall["init"][0], wall["end"][0]+1)]
+  return set(cells)
+
+
+def test_cells(path, config, cells):
+  assert set(config.walls) == cells, path
+  for cell in cells:
+    assert cell in config.walls, (path, cell)
+    for neighbour in [(cell[0]+1, cell[1]), (cell[0]-1, cell[1]), (cell[0], cell[1]+1), (cell[0], cell[1]-1)]:
+      assert (neighbour in config.walls) == (neighbour in cells), (path, neighbour)
+  print(f"Test test_cells {path}: OK")
+
+
+def test_first_hit(path, config, cells):
+  rng = random.Random(path)
+  near = list(cells)
+  for _ in range(3000):
+    if near and rng.random() < 0.8:
+      col, row = rng.choice(near)
+      pos = (col + rng.randint(-40, 40), row + rng.randint(-40, 40))
+    else:
+      pos = (rng.randrange(config.dim[0]), rng.randrange(config.dim[1]))
+    col_mov, row_mov = rng.choice(list(config.movs.values()))
+    limit = rng.choice([1, 5, 50, 500, config.dim[0]])
+    expected = next((k for k in range(1, limit + 1) if (pos[0] + k*col_mov, pos[1] + k*row_mov) in cells), None)
+    assert config.walls.first_hit(pos, col_mov, row_mov, limit) == expected, (path, pos, col_mov, row_mov, limit)
+  print(f"Test test_first_hit {path}: OK")
+
+
+def test_overlapping_walls():
+  walls = [
+    {"init": (2, 0), "end": (2, 9)},   # vertical
+    {"init": (0, 4), "end": (6, 4)},   # horizontal crossing it
+    {"init": (4, 4), "end": (9, 4)},   # overlapping the previous one
+    {"init": (5, 8), "end": (5, 1)},   # reversed, covers nothing
+    {"init": (1, 1), "end": (3, 7)},   # diagonal, read as horizontal
+    {"init": (7, 7), "end": (7, 7)},   # single cell
+  ]
+  index = WallIndex(walls)
+  cells = exploded_walls(walls)
+  assert set(index) == cells
+  for col in range(-1, 11):
+    for row in range(-1, 11):
+      assert ((col, row) in index) == ((col, row) in cells), (col, row)
+      for col_mov, row_mov in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+        expected = next((k for k in range(1, 13) if (col + k*col_mov, row + k*row_mov) in cells), None)
+        assert index.first_hit((col, row), col_mov, row_mov, 12) == expected, (col, row, col_mov, row_mov)
+  print("Test test_overlapping_walls: OK")
+
+
+def main():
+  test_overlapping_walls()
+  for path in DATASETS:
+    config = MapConfig(path, 3 if "hard" in path else 2)
+    cells = exploded_walls(read_walls(path))
+    test_cells(path, config, cells)
+    test_first_hit(path, config, cells)
+
+
+if __name__ == '__main__':
+  main()
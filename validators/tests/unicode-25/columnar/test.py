@@ -0,0 +1,88 @@
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode25 import SCORE_ENGINES, ColumnarSchedule, calculate_score, parse_output, validate_schedule
+
+
+def horario_aleatorio(rng, num_days, num_materias):
+    return {day: [(rng.randrange(10), rng.randrange(num_materias), start, start + rng.randint(-1, 4))
+                  for start in (rng.randint(-2, 21) for _ in range(rng.randint(0, 30)))]
+            for day in sorted(rng.sample(range(0, num_days + 1), rng.randint(0, num_days)))}
+
+
+def texto(schedule):
+    lines = []
+    for day, classes in schedule.items():
+        lines.append(f"{day} {len(classes)}")
+        lines += [" ".join(map(str, c)) for c in classes]
+    return "\n".join(lines) + "\n"
+
+
+def test_parse(rng):
+    for _ in range(200):
+        schedule = horario_aleatorio(rng, 6, 5)
+        columnar, errors = parse_output(texto(schedule), columnar=True)
+        assert errors == []
+        assert isinstance(columnar, ColumnarSchedule)
+        assert list(columnar) == list(schedule)
+        for day, classes in schedule.items():
+            assert list(columnar[day]) == classes
+            assert [columnar[day][k] for k in range(-len(classes), len(classes))] == classes + classes
+    print("Test test_parse: OK")
+
+
+def test_validate(rng):
+    for _ in range(200):
+        num_days = rng.randint(1, 5)
+        schedule = horario_aleatorio(rng, 6, 5)
+        prof_hours_required = {(prof, materia): rng.randint(0, 5) for prof in range(10) for materia in range(5) if rng.random() < 0.3}
+        expected = validate_schedule(num_days, prof_hours_required, schedule)
+        columnar, _ = parse_output(texto(schedule), columnar=True)
+        assert validate_schedule(num_days, prof_hours_required, columnar) == expected
+        assert validate_schedule(num_days, prof_hours_required, ColumnarSchedule.from_schedule(schedule)) == expected
+    print("Test test_validate: OK")
+
+
+def test_score(rng):
+    for _ in range(200):
+        num_materias = rng.randint(1, 8)
+        enrollments = {student: set(rng.sample(range(num_materias), rng.randint(0, num_materias))) for student in range(rng.randint(0, 40))}
+        schedule = horario_aleatorio(rng, 5, num_materias)
+        expected = calculate_score(enrollments, schedule)
+        columnar = ColumnarSchedule.from_schedule(schedule)
+        for engine in SCORE_ENGINES:
+            assert calculate_score(enrollments, columnar, engine) == expected, (engine, enrollments, schedule)
+    print("Test test_score: OK")
+
+
+def test_int32():
+    # Los valores que no caben en 32 bits (ni en 64) se guardan enteros y se
+    # valida y puntúa lo mismo que sin columnar
+    enrollments = {1: {0, 1}, 2: {1}}
+    prof_hours_required = {(0, 0): 4, (1, 1): 2}
+    for big in [2**31, -2**31 - 1, 2**63, 2**70]:
+        text = f"1 2\n0 0 8 12\n1 1 14 16\n2 2\n0 0 8 {big}\n1 1 9 10\n3 1\n1 1 14 16\n"
+        schedule, errors = parse_output(text)
+        columnar, columnar_errors = parse_output(text, columnar=True)
+        assert errors == columnar_errors == [] and {day: list(classes) for day, classes in columnar.items()} == schedule
+        assert isinstance(columnar, ColumnarSchedule) == (big in range(-2**63, 2**63)), big
+        assert validate_schedule(3, prof_hours_required, columnar) == validate_schedule(3, prof_hours_required, schedule) != []
+        if big in range(-2**63, 2**63):
+            assert columnar.prof.typecode == 'q'
+            for engine in SCORE_ENGINES:
+                assert calculate_score(enrollments, columnar, engine) == calculate_score(enrollments, schedule), engine
+    print("Test test_int32: OK")
+
+
+def main():
+    rng = random.Random(16)
+    test_parse(rng)
+    test_validate(rng)
+    test_score(rng)
+    test_int32()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode25 import ERROR_MODES, ScheduleIndex, schedule_errors, validate_schedule
+
+
+def horario_aleatorio(rng, num_days, num_materias):
+    return {day: [(rng.randrange(6), rng.randrange(num_materias), start, start + rng.randint(-1, 4))
+                  for start in (rng.randint(5, 21) for _ in range(rng.randint(0, 30)))]
+            for day in rng.sample(range(0, num_days + 2), rng.randint(0, num_days + 1))}
+
+
+def test_budget(rng):
+    # Con max_errors se obtienen los primeros errores de la lista completa
+    for _ in range(300):
+        num_days = rng.randint(1, 4)
+        schedule = horario_aleatorio(rng, num_days, 4)
+        prof_hours_required = {(prof, materia): rng.randint(0, 5) for prof in range(6) for materia in range(4) if rng.random() < 0.4}
+        expected = validate_schedule(num_days, prof_hours_required, schedule)
+        assert list(schedule_errors(num_days, prof_hours_required, schedule)) == expected
+        for max_errors in [1, 2, 7, max(1, len(expected)), len(expected) + 1]:
+            index = ScheduleIndex.of(schedule)
+            assert validate_schedule(num_days, prof_hours_required, index, max_errors) == expected[:max_errors], max_errors
+        # Sin ningún error que buscar cualquier horario saldría válido
+        for max_errors in [0, -1]:
+            try:
+                validate_schedule(num_days, prof_hours_required, schedule, max_errors)
+                assert False, max_errors
+            except ValueError:
+                pass
+        for mode, max_errors in ERROR_MODES.items():
+            assert validate_schedule(num_days, prof_hours_required, schedule, max_errors) == expected[:max_errors], mode
+    print("Test test_budget: OK")
+
+
+def test_first():
+    # Un error de cada tipo, en el orden en que se comprueban las reglas
+    schedule = {1: [(0, 0, 10, 9), (0, 0, 8, 10), (0, 0, 9, 12), (1, 0, 19, 22)], 3: []}
+    errors = validate_schedule(2, {(0, 0): 1}, schedule)
+    assert [error.split(":")[0] for error in errors] == [
+        "Error Regla 4", "Error Regla 4", "Error Duracion", "Error Regla 3 (Solapamiento)",
+        "Error Regla 2", "Error Regla 5", "Error Regla 1", "Error Extra"], errors
+    for k in range(1, len(errors) + 1):
+        assert validate_schedule(2, {(0, 0): 1}, schedule, k) == errors[:k]
+    print("Test test_first: OK")
+
+
+def main():
+    rng = random.Random(17)
+    test_budget(rng)
+    test_first()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import tempfile
+
+sys.path.append("../../..")
+
+from unicode25 import parse_input
+
+STATIC = "../../../../api/static/unicode-25"
+
+
+def parse_input_lineas(file_path):
+    # parse_input leyendo el fichero línea a línea, como antes del mmap
+    prof_hours_required = {}
+    student_enrollments = {}
+    with open(file_path, 'r') as f:
+        num_days = int(f.readline().strip())
+        for _ in range(int(f.readline().strip())):
+            line = f.readline().strip()
+            if not line: continue
+            prof, materia, hours = map(int, line.split())
+            prof_hours_required[(prof, materia)] = hours
+        a, m = map(int, f.readline().strip().split())
+        for _ in range(a):
+            line = f.readline().strip()
+            if not line: continue
+            parts = list(map(int, line.split()))
+            student_enrollments[parts[0]] = set(parts[1:])
+    return num_days, prof_hours_required, student_enrollments
+
+
+def entrada_aleatoria(rng):
+    # Líneas en blanco, espacios de más, \r\n y la última línea sin salto
+    eol = rng.choice(["\n", "\r\n"])
+    sep = lambda: rng.choice([" ", "  ", "\t"])
+    profs = [f"{rng.randrange(20)}{sep()}{rng.randrange(50)}{sep()}{rng.randint(0, 9)}" if rng.random() < 0.9 else ""
+             for _ in range(rng.randint(0, 30))]
+    students = [sep().join(map(str, [student] + rng.sample(range(50), rng.randint(0, 12)))) if rng.random() < 0.9 else " "
+                for student in range(rng.randint(0, 3000))]
+    lines = [str(rng.randint(1, 5)), str(len(profs)), *profs, f"{len(students)} 50", *students]
+    return eol.join(lines) + rng.choice([eol, ""])
+
+
+def test_random(rng):
+    for _ in range(100):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", newline="", delete=False) as f:
+            f.write(entrada_aleatoria(rng))
+        try:
+            assert parse_input(f.name) == parse_input_lineas(f.name)
+        finally:
+            os.unlink(f.name)
+    print("Test test_random: OK")
+
+
+def test_static():
+    for filename in ["dummy.txt", "easy.txt", "medium.txt", "hard.txt"]:
+        assert parse_input(f"{STATIC}/{filename}") == parse_input_lineas(f"{STATIC}/{filename}"), filename
+    print("Test test_static: OK")
+
+
+def test_invalid():
+    # Un valor que no es un número falla como con int()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("1\n1\n0 0 x\n0 1\n")
+    try:
+        parse_input(f.name)
+        assert False, "ValueError esperado"
+    except ValueError:
+        pass
+    finally:
+        os.unlink(f.name)
+    print("Test test_invalid: OK")
+
+
+def main():
+    rng = random.Random(23)
+    test_random(rng)
+    test_static()
+    test_invalid()
+
+
+if __name__ == '__main__':
+    main()
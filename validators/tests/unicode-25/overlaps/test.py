@@ -0,0 +1,49 @@
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode25 import _overlapping_pairs, validate_schedule
+
+
+def regla2_cuadratica(day, classes):
+    # Comprobación original: cada clase contra las anteriores de su materia
+    errors = []
+    slots = {}
+    for prof, materia, start, end in classes:
+        if start < end:
+            for existing_start, existing_end in slots.get(materia, []):
+                if max(start, existing_start) < min(end, existing_end):
+                    errors.append(f"Error Regla 2: Dia {day}, Materia {materia} se imparte simultaneamente. Conflicto entre [{start}, {end}) y [{existing_start}, {existing_end}).")
+            slots.setdefault(materia, []).append((start, end))
+    return errors
+
+
+def test_pairs(rng):
+    for _ in range(500):
+        intervals = [(s, s + rng.randint(1, 5)) for s in (rng.randint(0, 30) for _ in range(rng.randint(0, 30)))]
+        expected = {(i, j) for i in range(len(intervals)) for j in range(i)
+                    if max(intervals[i][0], intervals[j][0]) < min(intervals[i][1], intervals[j][1])}
+        found = [tuple(sorted(pair, reverse=True)) for pair in _overlapping_pairs(intervals)]
+        assert len(found) == len(set(found)) and set(found) == expected, intervals
+    print("Test test_pairs: OK")
+
+
+def test_regla2(rng):
+    for _ in range(300):
+        schedule = {day: [(rng.randrange(8), rng.randrange(3), s, s + rng.randint(-1, 4)) for s in (rng.randint(6, 21) for _ in range(rng.randint(0, 40)))]
+                    for day in range(1, 4)}
+        errors = [error for error in validate_schedule(3, {}, schedule) if error.startswith("Error Regla 2")]
+        expected = [error for day, classes in schedule.items() for error in regla2_cuadratica(day, classes)]
+        assert errors == expected, schedule
+    print("Test test_regla2: OK")
+
+
+def main():
+    rng = random.Random(12)
+    test_pairs(rng)
+    test_regla2(rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import math
+import random
+import sys
+
+sys.path.append("../../..")
+
+from unicode25 import SCORE_ENGINES, calculate_score, parse_input
+
+STATIC = "../../../../api/static/unicode-25"
+
+
+def score_por_alumno(student_enrollments, schedule):
+    # Cálculo original: cada alumno filtra y ordena las clases de cada día
+    total_score = 0
+    for enrolled_materias in student_enrollments.values():
+        for day in sorted(schedule.keys()):
+            available_classes = sorted((start, -(end - start), end) for prof, materia, start, end in schedule[day]
+                                       if materia in enrolled_materias and start < end)
+            last_class_end_time = 0
+            i = 0
+            while i < len(available_classes):
+                start, neg_duration, end = available_classes[i]
+                while i < len(available_classes) and available_classes[i][0] == start:
+                    i += 1
+                if start < last_class_end_time:
+                    continue
+                total_score -= neg_duration
+                last_class_end_time = end
+    return 4.5 * math.log10(total_score + 1)
+
+
+def horario_aleatorio(rng, num_days, num_materias):
+    return {day: [(rng.randrange(10), rng.randrange(num_materias), start, start + rng.randint(-1, 4))
+                  for start in (rng.randint(-2, 21) for _ in range(rng.randint(0, 30)))]
+            for day in rng.sample(range(0, num_days + 1), rng.randint(0, num_days))}
+
+
+def test_random(rng):
+    for _ in range(300):
+        num_materias = rng.randint(1, 8)
+        enrollments = {student: set(rng.sample(range(num_materias), rng.randint(0, num_materias))) for student in range(rng.randint(0, 40))}
+        schedule = horario_aleatorio(rng, 5, num_materias)
+        expected = score_por_alumno(enrollments, schedule)
+        for engine in SCORE_ENGINES:
+            assert calculate_score(enrollments, schedule, engine) == expected, (engine, enrollments, schedule)
+    print("Test test_random: OK")
+
+
+def test_inputs(rng):
+    for filename in ["easy.txt", "medium.txt"]:
+        num_days, prof_hours_required, enrollments = parse_input(f"{STATIC}/{filename}")
+        num_materias = max(materia for _, materia in prof_hours_required) + 1
+        schedule = horario_aleatorio(rng, num_days, num_materias)
+        expected = score_por_alumno(enrollments, schedule)
+        for engine in SCORE_ENGINES:
+            assert calculate_score(enrollments, schedule, engine) == expected, (engine, filename)
+        print(f"Test test_inputs {filename}: OK")
+
+
+def test_engines_hard(rng):
+    # Horarios dentro de 8-20 como los que llegan a puntuarse, con las matrículas de hard.txt
+    num_days, prof_hours_required, enrollments = parse_input(f"{STATIC}/hard.txt")
+    for _ in range(3):
+        schedule = {day: [] for day in range(1, num_days + 1)}
+        for (prof, materia), hours in prof_hours_required.items():
+            while hours > 0:
+                duration = min(hours, rng.randint(1, 3))
+                start = rng.randint(8, 20 - duration)
+                schedule[rng.randint(1, num_days)].append((prof, materia, start, start + duration))
+                hours -= duration
+        totals = {engine: total_hours(enrollments, schedule) for engine, total_hours in SCORE_ENGINES.items()}
+        assert len(set(totals.values())) == 1, totals
+    print("Test test_engines_hard: OK")
+
+
+def main():
+    rng = random.Random(13)
+    test_random(rng)
+    test_inputs(rng)
+    test_engines_hard(rng)
+
+
+if __name__ == '__main__':
+    main()
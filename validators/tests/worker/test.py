@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+# The worker finds api/static from the repository root
+os.chdir("../../..")
+sys.path.append(".")
+os.environ.setdefault("API_URL", "http://localhost:3000")
+
+from fastapi.testclient import TestClient
+
+from api import tasks, worker
+
+
+def pizza_body(filenames):
+    return {"event": "test", "title": "one-pizza", "difficulty": "easy", "points": 0, "files": [{
+        "filename": filename, "type": "text/plain", "size": 0, "languageId": 0, "content": f"1 {i}", "tests": []}
+        for i, filename in enumerate(filenames)]}
+
+
+def wait_idle():
+    for _ in range(300):
+        if worker.pool.pending == 0:
+            return
+        time.sleep(0.01)
+    raise AssertionError("validations still pending")
+
+
+def test_pizza_capacity(client):
+    # A request with more files than free slots is rejected as a whole
+    # before any of them is scored
+    worker.pool.max_pending = 2
+    completed = worker.pool.completed
+    response = client.post("/validator/one-pizza", json=pizza_body(["a_an_example.txt"] * 3))
+    assert response.status_code == 429, response.text
+    assert worker.pool.completed == completed and worker.pool.reserved == 0
+    assert client.post("/validator/one-pizza", json=pizza_body(["a_an_example.txt"] * 2)).status_code == 200
+    print("Test test_pizza_capacity: OK")
+
+
+def test_pizza_failure(client):
+    # The first file that fails answers the request without waiting for the rest
+    def one_pizza(filename, content):
+        if filename == "b_basic.txt":
+            raise ValueError("broken pizza")
+        time.sleep(1)
+        return 0
+
+    worker.pool.max_pending = 16
+    scored = tasks.one_pizza
+    tasks.one_pizza = one_pizza
+    try:
+        start = time.perf_counter()
+        response = client.post("/validator/one-pizza", json=pizza_body(["c_coarse.txt", "b_basic.txt", "d_difficult.txt"]))
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 500 and "broken pizza" in response.text, response.text
+        assert elapsed < 0.8, elapsed
+        wait_idle()
+        assert worker.pool.reserved == 0
+    finally:
+        tasks.one_pizza = scored
+    print("Test test_pizza_failure: OK")
+
+
+def main():
+    worker.results.maxsize = 0
+    with TestClient(worker.app) as client:
+        test_pizza_capacity(client)
+        test_pizza_failure(client)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,73 +11,337 @@
 # Cosas a evaluar
 #   - Si se valida correctamente -> determinar puntuación en base a número de movimientos
 
+import bisect
+import collections
 import functools
+import itertools
 import math
+import multiprocessing
 import re
+import threading
+
+import numpy as np
+
+try:
+  from validators.mapped import MappedText
+except ImportError:
+  # Tests import the validators from the validators directory itself
+  from mapped import MappedText
+
+
+class WallIndex:
+  """
+  Walls kept as sorted, merged intervals per row (horizontal walls) and per
+  column (vertical walls) instead of one entry per covered cell.
+  A wall covers the same cells as before: (x, y) for y in [Yinit, Yend]
+  when Xinit == Xend, otherwise (x, Yinit) for x in [Xinit, Xend]. A range
+  whose end is before its init covers no cell.
+  """
+
+  def __init__(self, walls):
+    rows, cols = {}, {}
+    for wall in walls:
+      (x_init, y_init), (x_end, y_end) = wall["init"], wall["end"]
+      if x_init == x_end: # Vertical wall
+        if y_init <= y_end:
+          cols.setdefault(x_init, []).append((y_init, y_end))
+      elif x_init <= x_end: # Horizontal wall
+        rows.setdefault(y_init, []).append((x_init, x_end))
+    self.rows = {y: self.merge(intervals) for y, intervals in rows.items()}
+    self.cols = {x: self.merge(intervals) for x, intervals in cols.items()}
+    self.row_keys = sorted(self.rows)
+    self.col_keys = sorted(self.cols)
+
+  def arrays(self):
+    """
+    The merged intervals as (line, start, end) rows, per row and per column
+    """
+    return {
+      f"wall_{name}": np.array([(line, start, end) for line, (starts, ends) in lines.items() for start, end in zip(starts, ends)],
+                               dtype=np.int64).reshape(-1, 3)
+      for name, lines in (("rows", self.rows), ("cols", self.cols))
+    }
+
+  @classmethod
+  def from_arrays(cls, arrays):
+    walls = cls([])
+    for name, lines in (("rows", walls.rows), ("cols", walls.cols)):
+      for line, start, end in arrays[f"wall_{name}"].tolist():
+        starts, ends = lines.setdefault(line, ([], []))
+        starts.append(start)
+        ends.append(end)
+    walls.row_keys = sorted(walls.rows)
+    walls.col_keys = sorted(walls.cols)
+    return walls
+
+  @staticmethod
+  def merge(intervals):
+    """
+    Merge overlapping/adjacent intervals into ([starts], [ends]), sorted
+    """
+    starts, ends = [], []
+    for start, end in sorted(intervals):
+      if ends and start <= ends[-1] + 1:
+        ends[-1] = max(ends[-1], end)
+      else:
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
+
+  @staticmethod
+  def covers(intervals, value):
+    starts, ends = intervals
+    i = bisect.bisect_right(starts, value) - 1
+    return i >= 0 and ends[i] >= value
+
+  def __contains__(self, pos):
+    col, row = pos
+    return (row in self.rows and self.covers(self.rows[row], col)) or \
+      (col in self.cols and self.covers(self.cols[col], row))
+
+  def __iter__(self):
+    """
+    Every covered cell (a cell in a horizontal and a vertical wall shows up twice)
+    """
+    for row, (starts, ends) in self.rows.items():
+      for start, end in zip(starts, ends):
+        yield from ((col, row) for col in range(start, end + 1))
+    for col, (starts, ends) in self.cols.items():
+      for start, end in zip(starts, ends):
+        yield from ((col, row) for row in range(start, end + 1))
+
+  def first_hit(self, pos, col_mov, row_mov, limit):
+    """
+    Number of steps (1..limit) from pos in the given direction until the
+    first wall cell, or None if the segment doesn't hit any wall
+    """
+    col, row = pos
+    if col_mov != 0:
+      return self.first_on_line(self.rows, self.cols, self.col_keys, row, col, col_mov, limit)
+    return self.first_on_line(self.cols, self.rows, self.row_keys, col, row, row_mov, limit)
+
+  def first_on_line(self, along, across, across_keys, line, start, step, limit):
+    # Walls lying on the line
+    best = None
+    if line in along:
+      starts, ends = along[line]
+      if step > 0:
+        i = bisect.bisect_right(ends, start)
+        if i < len(starts):
+          best = max(starts[i], start + 1) - start
+      else:
+        i = bisect.bisect_left(starts, start) - 1
+        if i >= 0:
+          best = start - min(ends[i], start - 1)
+    if best is not None and best <= limit:
+      limit = best
+    else:
+      best = None
+
+    # Walls crossing the line, nearest first and only up to the best hit so far
+    if step > 0:
+      i = bisect.bisect_right(across_keys, start)
+      while i < len(across_keys) and across_keys[i] - start <= limit:
+        if self.covers(across[across_keys[i]], line):
+          return across_keys[i] - start
+        i += 1
+    else:
+      i = bisect.bisect_left(across_keys, start) - 1
+      while i >= 0 and start - across_keys[i] <= limit:
+        if self.covers(across[across_keys[i]], line):
+          return start - across_keys[i]
+        i -= 1
+    return best
+
+
+class DroneClock:
+  """
+  Steps taken so far in one validation, which set where every drone is
+  (level 3). Kept apart from MapConfig so a cached config stays read-only
+  while several validations use it at the same time.
+  """
+  __slots__ = ("t",)
+
+  def __init__(self, t=0):
+    self.t = t
 
 
 class MapConfig:
+  # Steps simulated at once by the numpy engine: the window starts small
+  # after every event and doubles while no event is found
+  ROUTE_CHUNK = 4096
+  MIN_WINDOW = 64
+
+  movs = {
+    '>': (1, 0),
+    '<': (-1, 0),
+    '-': (0, 1),
+    '+': (0, -1),
+  }
+  mov_types = {vector: mov_type for mov_type, vector in movs.items()}
+
   def __init__(self, config_file, level):
     self.level = level
-    with open(config_file, 'r') as file:
-      file_reader = iter(file.readline, '')
+    # The numbers of the points, walls and tunnels are parsed a block of
+    # lines at a time straight from the mapped file
+    with MappedText(config_file) as file_reader:
       self.dim = tuple(map(int, next(file_reader).split(';'))) # (X, Y)
       self.initial_pos = tuple(next(file_reader).split(',')) # (x, y) 
       self.delivery_points = self.read_points(file_reader)
-      self.movs = {
-        '>': (1, 0),
-        '<': (-1, 0),
-        '-': (0, 1),
-        '+': (0, -1),
-      }
+      # Cells inside the map are packed into a single int: y * X + x
+      self.walls = WallIndex([])
+      self.tunnels = {} # packed entrance -> packed exit
+      tunnel_cells = []
       if level > 1:
-        walls_ = self.read_walls_or_tunnels(file_reader) 
-        # Transform wall ranges into all the positions that contain a wall
-        # Otherwise, for every point you would have to check whether the drone
-        # crashes into a wall, because you can't tell from origin and end positions
-        # of the drone
-        self.walls = []
-        for wall in walls_:
-          # Walls are not diagonal
-          if wall["init"][0] == wall["end"][0]: # Vertical wall
-            self.walls += [(wall["init"][0], y) for y in range(wall["init"][1], wall["end"][1]+1)]
-          else: # Horizontal wall
-            self.walls += [(x, wall["init"][1]) for x in range(wall["init"][0], wall["end"][0]+1)]
-        self.walls = set(self.walls)
-        self.tunnels = {}
+        self.walls = WallIndex(self.read_walls_or_tunnels(file_reader))
         for tun in self.read_walls_or_tunnels(file_reader):
-          self.tunnels[f"{tun["init"]}"] = tun["end"]
-          self.tunnels[f"{tun["end"]}"] = tun["init"]
+          self.tunnels[self.pack(tun["init"])] = self.pack(tun["end"])
+          self.tunnels[self.pack(tun["end"])] = self.pack(tun["init"])
+          tunnel_cells += [tun["init"], tun["end"]]
         
       if level > 2:
         self.drones = self.read_drones(file_reader) 
+        self.index_drones()
+
+    # Sorted per-row/per-column index of tunnel entrances, used to move a
+    # whole run of steps at once (levels 1 and 2)
+    self.tunnel_rows, self.tunnel_cols = self.index_cells(tunnel_cells)
+
+  def arrays(self):
+    """
+    The parsed config as numpy arrays, to be saved as a snapshot (see
+    validators/snapshots.py): the sections of its level, with the wall
+    intervals and the drone index already built.
+    """
+    arrays = {
+      "dim": np.array(self.dim, dtype=np.int64),
+      "initial_pos": np.array(self.initial_pos, dtype=str),
+      "points": np.array([(*point["coords"], -1 if point["s"] is None else point["s"]) for point in self.delivery_points],
+                         dtype=np.int64).reshape(-1, 3),
+    }
+    if self.level > 1:
+      arrays.update(self.walls.arrays())
+      arrays["tunnels"] = np.array(list(self.tunnels.items()), dtype=np.int64).reshape(-1, 2)
+      arrays["tunnel_cells"] = np.array([(x, y) for y, xs in self.tunnel_rows.items() for x in xs], dtype=np.int64).reshape(-1, 2)
+    if self.level > 2:
+      movs = [drone["movs"] for drone in self.drones]
+      arrays["drone_origins"] = np.array([drone["origin"] for drone in self.drones], dtype=np.int64)
+      arrays["drone_movs"] = np.frombuffer("".join(movs).encode(), dtype=np.uint8)
+      arrays["drone_movs_offsets"] = np.cumsum([0] + [len(m) for m in movs])
+      # The (period, phase, vertical) entries of drone_cells[cell] go from drone_cell_offsets[i]
+      entries = [entry for entries in self.drone_cells.values() for entry in entries]
+      arrays["drone_cells"] = np.array(list(self.drone_cells), dtype=np.int64)
+      arrays["drone_cell_offsets"] = np.cumsum([0] + [len(entries) for entries in self.drone_cells.values()])
+      arrays["drone_periods"] = np.array([entry[0] for entry in entries], dtype=np.int64)
+      arrays["drone_phases"] = np.array([entry[1] for entry in entries], dtype=np.int64)
+      arrays["drone_vertical"] = np.array([entry[2] for entry in entries], dtype=bool)
+      arrays["drifting_drones"] = np.array([drone[:3] for drone in self.drifting_drones], dtype=np.int64).reshape(-1, 3)
+      for k, name in ((3, "cols"), (4, "rows"), (5, "vertical")):
+        arrays[f"drifting_{name}"] = np.array([v for drone in self.drifting_drones for v in drone[k]], dtype=np.int64)
+    return arrays
+
+  @classmethod
+  def from_arrays(cls, arrays, level):
+    """
+    MapConfig of the given level from the arrays() of a config of that level
+    or above, without parsing the input file or indexing the drones again.
+    """
+    config = cls.__new__(cls)
+    config.level = level
+    config.dim = tuple(arrays["dim"].tolist())
+    config.initial_pos = tuple(arrays["initial_pos"].tolist())
+    config.delivery_points = [{"coords": (x, y), "s": None if s < 0 else s} for x, y, s in arrays["points"].tolist()]
+    config.walls = WallIndex([])
+    config.tunnels = {}
+    tunnel_cells = []
+    if level > 1:
+      config.walls = WallIndex.from_arrays(arrays)
+      config.tunnels = dict(arrays["tunnels"].tolist())
+      tunnel_cells = arrays["tunnel_cells"].tolist()
+    if level > 2:
+      movs = arrays["drone_movs"].tobytes().decode()
+      offsets = arrays["drone_movs_offsets"].tolist()
+      config.drones = [{"origin": origin, "movs": movs[lo:hi], "total_movs": hi - lo}
+                       for origin, lo, hi in zip(arrays["drone_origins"].tolist(), offsets, offsets[1:])]
+      entries = list(zip(arrays["drone_periods"].tolist(), arrays["drone_phases"].tolist(), arrays["drone_vertical"].tolist()))
+      offsets = arrays["drone_cell_offsets"].tolist()
+      config.drone_cells = dict(zip(arrays["drone_cells"].tolist(), map(entries.__getitem__, map(slice, offsets, offsets[1:]))))
+      config.drifting_drones = []
+      cols, rows = arrays["drifting_cols"].tolist(), arrays["drifting_rows"].tolist()
+      vertical = [bool(v) for v in arrays["drifting_vertical"].tolist()]
+      # Each drifting drone has period + 1 positions and period moves
+      positions = moves = 0
+      for period, col0, row0 in arrays["drifting_drones"].tolist():
+        config.drifting_drones.append((period, col0, row0, cols[positions:positions + period + 1],
+                                       rows[positions:positions + period + 1], vertical[moves:moves + period]))
+        positions += period + 1
+        moves += period
+    config.tunnel_rows, config.tunnel_cols = config.index_cells(tunnel_cells)
+    return config
+
+  def pack(self, pos):
+    return pos[1] * self.dim[0] + pos[0]
+
+  def unpack(self, cell):
+    row, col = divmod(cell, self.dim[0])
+    return (col, row)
+
+  def inside(self, pos):
+    return 0 <= pos[0] < self.dim[0] and 0 <= pos[1] < self.dim[1]
+
+  def index_cells(self, cells):
+    """
+    Group cells by row and by column: ({y: sorted xs}, {x: sorted ys})
+    """
+    rows, cols = {}, {}
+    for x, y in cells:
+      rows.setdefault(y, []).append(x)
+      cols.setdefault(x, []).append(y)
+    for line in (*rows.values(), *cols.values()):
+      line.sort()
+    return rows, cols
 
   def read_points(self, reader):
     """
     Delivery point type: id, coords, s
-    Parse: X;Y[;S]
+    Parse: X,Y[,S]
+    reader: MappedText positioned at the number of points
     """
-    total_points = int(next(reader)) 
-    return [{
-        "coords": (int(next_point[0]), int(next_point[1])),
-        "s": None if len(next_point) <= 2 else int(next_point[2])
-    } for _ in range(total_points) if (next_point := next(reader).split(','))] 
+    total_points = int(next(reader))
+    points = []
+    for values, offsets in reader.int_line_blocks(total_points, b","):
+      if np.diff(offsets).min() < 2:
+        raise ValueError(f"Expected {total_points} delivery points as X,Y[,S]")
+      values, offsets = values.tolist(), offsets.tolist()
+      points += [{
+          "coords": (values[lo], values[lo + 1]),
+          "s": None if hi - lo <= 2 else values[lo + 2]
+      } for lo, hi in zip(offsets, offsets[1:])]
+    if len(points) < total_points:
+      raise ValueError(f"Expected {total_points} delivery points as X,Y[,S]")
+    return points
     
 
   def read_walls_or_tunnels(self, reader):
     """
     Wall/Tunnel type: initial coords, final coords
-    Parse: Xinit;Yinit:Xend;Yend
+    Parse: Xinit,Yinit;Xend,Yend
+    reader: MappedText positioned at the number of walls/tunnels
     """
     total_walls = int(next(reader))
+    values, offsets = reader.int_lines(total_walls, b",;")
+    counts = np.diff(offsets)
+    if len(counts) < total_walls or np.any(counts != 4):
+      raise ValueError(f"Expected {total_walls} walls/tunnels as Xinit,Yinit;Xend,Yend")
+    values = values.tolist()
     return [{
-      "init": tuple(map(int, next_wall[0].split(','))),
-      "end": tuple(map(int, next_wall[1].split(',')))
-    } for _ in range(total_walls) if (next_wall := next(reader).split(';'))]
+      "init": (values[i], values[i + 1]),
+      "end": (values[i + 2], values[i + 3])
+    } for i in range(0, len(values), 4)]
   
   def read_drones(self, reader):
     """
-    Drone type: { position: (X,Y); movs: unfolded_movs; next_mov: index of next mov in movs  }
+    Drone type: { origin: packed X,Y; movs: unfolded_movs; total_movs: period of the pattern }
     Parse: X,Y;movs 
     """
     total_drones = int(next(reader))
@@ -89,37 +353,64 @@ class MapConfig:
       for mov in matched_movs:
         num_movs_of_type, mov_type = int(mov[:-1]), mov[-1]
         unfolded_movs += mov_type * num_movs_of_type
+      origin = self.pack(tuple(map(int, next_drone[0].split(','))))
       drones.append({
-        "position": tuple(map(int, next_drone[0].split(','))), 
+        "origin": origin,
         "movs": unfolded_movs, 
-        "next_mov": 0,
         "total_movs": len(unfolded_movs) 
       })
     return drones
   
-  def check_drone_collision(self, drone, pos, prev_pos):
+  def index_drones(self):
     """
-      This method does also update each drone's position due to efficiency requirements
+    Precompute every drone's trajectory over one period of its pattern.
+    Drones that end the period where they started are indexed by cell:
+    drone_cells[cell] -> [(period, phase, moves vertically from there)].
+    Drones with a net displacement can't be indexed, their position at any
+    time is computed from the period arrays (wrapping around the map).
     """
-    drone_prev_pos = drone["position"]
-    drone_next_pos, err = self.move_drone(drone_prev_pos, drone["movs"][drone["next_mov"]]) 
-    if err is not None:
-      drone_next_pos = (drone_next_pos[0] % self.dim[1], drone_next_pos[1] % self.dim[0])
-    # Update drone's position
-    drone["position"] = drone_next_pos
-    drone["next_mov"] = (drone["next_mov"] + 1) % drone["total_movs"]
-
-    # Check for drone collision
-    if drone_prev_pos[0] == drone_next_pos[0] and pos[0] == prev_pos[0]: # Movimiento eje vertical de ambos
-      return drone_next_pos == pos or drone_prev_pos == pos
-    elif drone_prev_pos[1] == drone_next_pos[1] and pos[1] == prev_pos[1]: # Movimiento eje horizontal de ambos
-      return drone_next_pos == pos or drone_prev_pos == pos
-    else:
-      return drone_next_pos == pos
+    self.drone_cells = {}
+    self.drifting_drones = []
+    for drone in self.drones:
+      movs = np.array([self.movs[m] for m in drone["movs"]] or [(0, 0)], dtype=np.int64)
+      period = len(movs)
+      col0, row0 = self.unpack(drone["origin"])
+      cols = np.concatenate(([0], np.cumsum(movs[:, 0])))
+      rows = np.concatenate(([0], np.cumsum(movs[:, 1])))
+      vertical = (movs[:, 0] == 0).tolist()
+      if cols[-1] == 0 and rows[-1] == 0:
+        cells = (row0 + rows[:-1]) % self.dim[1] * self.dim[0] + (col0 + cols[:-1]) % self.dim[0]
+        for phase, cell in enumerate(cells.tolist()):
+          self.drone_cells.setdefault(cell, []).append((period, phase, vertical[phase]))
+      else:
+        self.drifting_drones.append((period, col0, row0, cols.tolist(), rows.tolist(), vertical))
 
+  def drifting_drone_at(self, drone, t):
+    period, col0, row0, cols, rows, _ = drone
+    laps, phase = divmod(t, period)
+    col = (col0 + laps * cols[-1] + cols[phase]) % self.dim[0]
+    row = (row0 + laps * rows[-1] + rows[phase]) % self.dim[1]
+    return row * self.dim[0] + col
 
-  def drone_at(self, pos, prev_pos):
-    return any(self.check_drone_collision(drone, pos, prev_pos) for drone in self.drones)
+  def drone_at(self, cell, same_col, same_row, clock):
+    """
+    Advance the clock one step and check the player's drone at packed cell
+    against every drone. Drones moving along the same row/column as the
+    player's drone also collide with it when they swap cells.
+    """
+    clock.t += 1
+    t = clock.t
+    for period, phase, vertical in self.drone_cells.get(cell, ()):
+      if t % period == phase:
+        return True
+      if (t - 1) % period == phase and (same_col if vertical else same_row):
+        return True
+    for drone in self.drifting_drones:
+      if self.drifting_drone_at(drone, t) == cell:
+        return True
+      if (same_col if drone[5][(t - 1) % drone[0]] else same_row) and self.drifting_drone_at(drone, t - 1) == cell:
+        return True
+    return False
   
   def move_drone(self, pos, mov_type):
     col, row = pos 
@@ -138,36 +429,245 @@ class MapConfig:
     except Exception as e:
       return None, f"Unexpected movement type found: {mov_type}"
     
-  def process_next_move(self, prev_result, mov_type):
-    prev_pos, total_movs = prev_result
-    curr_pos, err = self.move_drone(prev_pos, mov_type)
+  def process_next_move(self, clock, prev_result, mov_type):
+    """
+    Single step from a packed position inside the map (level 3)
+    """
+    prev_cell, total_movs = prev_result
+    prev_row, prev_col = divmod(prev_cell, self.dim[0])
+    col_mov, row_mov = self.movs[mov_type]
+    col, row = prev_col + col_mov, prev_row + row_mov
+    if not (0 <= col < self.dim[0] and 0 <= row < self.dim[1]):
+      _, err = self.move_drone((prev_col, prev_row), mov_type)
+      raise Exception(err)
+    return (self.arrive(row * self.dim[0] + col, prev_col, prev_row, clock), total_movs+1)
+
+  def enter_map(self, pos, mov_type, clock):
+    """
+    First step of a route whose origin is outside the map. Returns the
+    packed position, as the drone is inside the map if it didn't crash.
+    """
+    curr_pos, err = self.move_drone(pos, mov_type)
     if err is not None:
-      raise Exception(err) 
+      raise Exception(err)
+    return self.arrive(self.pack(curr_pos), pos[0], pos[1], clock)
 
+  def arrive(self, cell, prev_col, prev_row, clock):
+    """
+    Tunnel, wall and drone checks for the packed cell just stepped on
+    """
     if self.level > 1:
-      if (tunnel_exit := self.tunnels.get(f"{curr_pos}")) is not None:
-        curr_pos = tunnel_exit
+      if (tunnel_exit := self.tunnels.get(cell)) is not None:
+        cell = tunnel_exit
+      curr_pos = self.unpack(cell)
       if curr_pos in self.walls:
         raise Exception(f"Drone crushed into a wall at {curr_pos}!!")
     if self.level > 2:
-      if self.drone_at(curr_pos, prev_pos):
+      if self.drone_at(cell, curr_pos[0] == prev_col, curr_pos[1] == prev_row, clock):
         raise Exception(f"Your drone collided with another drone at {curr_pos} (Nobody was hurt ;)")
-    return (curr_pos, total_movs+1)
+    return cell
 
-  
-  def traverse_path(self, origin, movs):
-    # origin -> (column, row)
+  def first_cell(self, index, line, start, step, limit):
+    """
+    Number of steps (1..limit) from start along line until the first indexed
+    cell in direction step, or None if there is none within limit
+    """
+    cells = index.get(line)
+    if not cells:
+      return None
+    if step > 0:
+      i = bisect.bisect_right(cells, start)
+      k = cells[i] - start if i < len(cells) else None
+    else:
+      i = bisect.bisect_left(cells, start) - 1
+      k = start - cells[i] if i >= 0 else None
+    return k if k is not None and k <= limit else None
+
+  def steps_inside(self, pos, col_mov, row_mov):
+    """
+    Number of consecutive steps from pos in the given direction that stay in the map
+    """
+    col, row = pos
+    if col_mov != 0:
+      if not (0 <= row < self.dim[1] and 0 <= col + col_mov < self.dim[0]):
+        return 0
+      return self.dim[0] - 1 - col if col_mov > 0 else col
+    if not (0 <= col < self.dim[0] and 0 <= row + row_mov < self.dim[1]):
+      return 0
+    return self.dim[1] - 1 - row if row_mov > 0 else row
+
+  def process_run(self, pos, mov_type, steps):
+    """
+    Move `steps` cells in one direction at once (levels 1 and 2).
+    Bounds are checked with arithmetic and walls/tunnels through the sorted
+    row/column indexes, jumping straight to the first event of the run.
+    Raises the same errors as process_next_move would at the same step.
+    """
+    col_mov, row_mov = self.movs[mov_type]
+    while steps > 0:
+      col, row = pos
+      inside = self.steps_inside(pos, col_mov, row_mov)
+      limit = min(steps, inside)
+      wall = self.walls.first_hit(pos, col_mov, row_mov, limit)
+      if col_mov != 0:
+        tunnel = self.first_cell(self.tunnel_rows, row, col, col_mov, limit)
+      else:
+        tunnel = self.first_cell(self.tunnel_cols, col, row, row_mov, limit)
+
+      if tunnel is not None and (wall is None or tunnel <= wall):
+        pos = self.unpack(self.tunnels[self.pack((col + tunnel * col_mov, row + tunnel * row_mov))])
+        if pos in self.walls:
+          raise Exception(f"Drone crushed into a wall at {pos}!!")
+        steps -= tunnel
+      elif wall is not None:
+        raise Exception(f"Drone crushed into a wall at {(col + wall * col_mov, row + wall * row_mov)}!!")
+      elif steps > inside:
+        _, err = self.move_drone((col + inside * col_mov, row + inside * row_mov), mov_type)
+        raise Exception(err)
+      else:
+        pos = (col + steps * col_mov, row + steps * row_mov)
+        steps = 0
+    return pos
+
+  def traverse_path(self, origin, movs, clock=None):
+    # origin -> (column, row); clock: DroneClock of the validation (a new
+    # one, with the drones at their origin, if None)
+    clock = DroneClock() if clock is None else clock
     curr_pos = origin
     matched_movs = re.findall(r'\d+[><+-]', movs)
     # print(f"Path traversal from origin: {origin}")
     try:
-      curr_pos, num_movs = functools.reduce(self.process_next_move, (mov[-1] for mov in matched_movs for _ in range(int(mov[:-1]))), (curr_pos, 0)) 
+      if self.level > 2:
+        # Drones move on every single step, so the path is walked step by step
+        steps = (mov[-1] for mov in matched_movs for _ in range(int(mov[:-1])))
+        num_movs = 0
+        if not self.inside(curr_pos):
+          if (first_step := next(steps, None)) is None:
+            return curr_pos, 0, None
+          curr_pos, num_movs = self.enter_map(curr_pos, first_step, clock), 1
+        else:
+          curr_pos = self.pack(curr_pos)
+        curr_pos, num_movs = functools.reduce(functools.partial(self.process_next_move, clock), steps, (curr_pos, num_movs))
+        curr_pos = self.unpack(curr_pos)
+      else:
+        num_movs = 0
+        for mov in matched_movs:
+          curr_pos = self.process_run(curr_pos, mov[-1], int(mov[:-1]))
+          num_movs += int(mov[:-1])
     except Exception as e:
       return None, None, str(e)
         
     return curr_pos, num_movs, None
 
 
+  @functools.cached_property
+  def event_grid(self):
+    """
+    One bit per packed cell, set on walls and tunnel entrances: the cells
+    where the numpy engine falls back to the single step checks.
+    None when the map has neither.
+    """
+    cells = [self.pack(pos) for pos in self.walls if self.inside(pos)] + list(self.tunnels)
+    if not cells:
+      return None
+    cells = np.array(cells, dtype=np.int64)
+    grid = np.zeros((self.dim[0] * self.dim[1] + 7) // 8, dtype=np.uint8)
+    np.bitwise_or.at(grid, cells >> 3, (128 >> (cells & 7)).astype(np.uint8))
+    return grid
+
+  @functools.cached_property
+  def drone_keys(self):
+    # Sorted cells visited by periodic drones, never empty
+    return np.array(sorted(self.drone_cells) or [-1], dtype=np.int64)
+
+  def unfold_route(self, matched_movs):
+    """
+    Unfold route tokens into arrays of step vectors of at most ROUTE_CHUNK steps
+    """
+    types, counts, pending = [], [], 0
+    for mov in matched_movs:
+      mov_type, num = mov[-1], int(mov[:-1])
+      while num > 0:
+        take = min(num, self.ROUTE_CHUNK - pending)
+        types.append(self.movs[mov_type])
+        counts.append(take)
+        pending += take
+        num -= take
+        if pending == self.ROUTE_CHUNK:
+          yield np.repeat(np.array(types, dtype=np.int64), counts, axis=0)
+          types, counts, pending = [], [], 0
+    if pending:
+      yield np.repeat(np.array(types, dtype=np.int64), counts, axis=0)
+
+  def drone_candidates(self, cells, clock):
+    """
+    Steps (starting at clock.t + 1) where a drone may hit the player's drone.
+    Superset of the real collisions, which are confirmed with drone_at.
+    """
+    keys = self.drone_keys
+    candidates = keys[np.minimum(np.searchsorted(keys, cells), len(keys) - 1)] == cells
+    if self.drifting_drones:
+      t = clock.t + np.arange(len(cells) + 1)
+      for period, col0, row0, cols, rows, _ in self.drifting_drones:
+        laps, phase = np.divmod(t, period)
+        drone_cols = (col0 + laps * cols[-1] + np.asarray(cols)[phase]) % self.dim[0]
+        drone_rows = (row0 + laps * rows[-1] + np.asarray(rows)[phase]) % self.dim[1]
+        drone_cells = drone_rows * self.dim[0] + drone_cols
+        candidates |= (drone_cells[1:] == cells) | (drone_cells[:-1] == cells)
+    return candidates
+
+  def traverse_path_numpy(self, origin, movs, clock=None):
+    """
+    Same result as traverse_path, simulating a window of steps at a time:
+    positions come from a cumulative sum of the step vectors and the first
+    step that leaves the map, hits a wall/tunnel cell or may meet a drone is
+    found with argmax. That step goes through the single step checks and
+    the simulation goes on from there with a small window again.
+    """
+    clock = DroneClock() if clock is None else clock
+    col, row = origin
+    num_movs = 0
+    grid = self.event_grid
+    window = self.MIN_WINDOW
+    try:
+      for chunk in self.unfold_route(re.findall(r'\d+[><+-]', movs)):
+        while len(chunk):
+          vectors = chunk[:window]
+          cols = col + np.cumsum(vectors[:, 0])
+          rows = row + np.cumsum(vectors[:, 1])
+          outside = (cols < 0) | (cols >= self.dim[0]) | (rows < 0) | (rows >= self.dim[1])
+          cells = np.where(outside, 0, rows * self.dim[0] + cols)
+          events = outside
+          if grid is not None:
+            events = events | (grid[cells >> 3] & (128 >> (cells & 7))).astype(bool)
+          if self.level > 2:
+            events = events | self.drone_candidates(cells, clock)
+          k = int(np.argmax(events))
+          if not events[k]:
+            col, row = int(cols[-1]), int(rows[-1])
+            num_movs += len(vectors)
+            if self.level > 2:
+              clock.t += len(vectors)
+            chunk = chunk[len(vectors):]
+            window = min(2 * window, self.ROUTE_CHUNK)
+            continue
+
+          if self.level > 2:
+            clock.t += k
+          prev_col, prev_row = (col, row) if k == 0 else (int(cols[k-1]), int(rows[k-1]))
+          if outside[k]:
+            _, err = self.move_drone((prev_col, prev_row), self.mov_types[tuple(vectors[k].tolist())])
+            raise Exception(err)
+          col, row = self.unpack(self.arrive(int(cells[k]), prev_col, prev_row, clock))
+          num_movs += k + 1
+          chunk = chunk[k+1:]
+          window = self.MIN_WINDOW
+    except Exception as e:
+      return None, None, str(e)
+
+    return (col, row), num_movs, None
+
+
   def contains_all_dpoints(self, ids):
     expected_ids = set([i+1 for i in range(len(self.delivery_points))])
     received_ids = set(ids)
@@ -186,45 +686,192 @@ def parse_route(raw_route):
 
 
 
-def validate_output(config, file_content):
-  file_content = file_content.split('\n')
-  reported_movs = int(file_content[0])
+ENGINES = {
+  "step": MapConfig.traverse_path,
+  "numpy": MapConfig.traverse_path_numpy,
+}
+
+
+def iter_lines(text):
+  """
+  Lines of text as split('\\n') would return them, without building the list
+  """
+  start = 0
+  while (end := text.find('\n', start)) != -1:
+    yield text[start:end]
+    start = end + 1
+  yield text[start:]
+
+
+def check_routes(config, traverse_path, raw_routes, clock=None):
+  """
+  Parse and traverse routes, checking they end at their delivery point.
+  clock: DroneClock shared by the routes (level 3), or None for a new one
+  per route.
+  Yields per route ("ok", point_id, movs), ("err", point_id, message) or
+  ("raise", point_id, exception) and stops after the first one that isn't ok.
+  The checks that depend on the other routes are left to validate_output.
+  """
+  for raw_route in raw_routes:
+    try:
+      route = parse_route(raw_route)
+    except Exception as e:
+      yield "raise", None, e
+      return
+    try:
+      coords, path_movs, err = traverse_path(config, route["initial_coords"], route["movs"], clock)
+      if err is None and coords != (expected_coords := config.delivery_points[route["point_id"]-1].get("coords")):
+        err = f"Movements to reach delivery point with id {route["point_id"]} from {route["initial_coords"]} end up at {coords}, expected {expected_coords}"
+    except Exception as e:
+      yield "raise", route["point_id"], e
+      return
+    if err is not None:
+      yield "err", route["point_id"], err
+      return
+    yield "ok", route["point_id"], path_movs
+
+
+# (config, traverse_path) of the validation a pool process works for, set by
+# the pool initializer in each process (never in the validating process)
+_shared_map = None
+ROUTES_PER_TASK = 2048
+# Blocks of routes sent to each pool process ahead of the one being read
+TASKS_PER_PROCESS = 2
+# (config, traverse_path, processes, pool, threads of the pool) of the last
+# parallel validation
+_route_pool = None
+
+
+def share_map(config, traverse_path):
+  global _shared_map
+  _shared_map = (config, traverse_path)
+
+
+def check_shared_routes(raw_routes):
+  return list(check_routes(*_shared_map, raw_routes))
+
+
+def route_blocks(lines):
+  block = []
+  for line in lines:
+    if line.strip() != "":
+      block.append(line)
+      if len(block) == ROUTES_PER_TASK:
+        yield block
+        block = []
+  if block:
+    yield block
+
+
+def route_pool(config, traverse_path, processes):
+  """
+  Pool of forked processes that check routes on config. Its processes get
+  the map through the pool initializer, so the pool is reused while the
+  validations use the same map (the cached MapConfig of an input file) and
+  replaced by the first validation of another one.
+  """
+  global _route_pool
+  if _route_pool is not None:
+    last_config, last_traverse_path, last_processes, pool, _ = _route_pool
+    if last_config is config and last_traverse_path is traverse_path and last_processes == processes:
+      return pool
+    pool.terminate()
+    _route_pool = None
+  threads = set(threading.enumerate())
+  pool = multiprocessing.get_context("fork").Pool(processes, initializer=share_map, initargs=(config, traverse_path))
+  _route_pool = (config, traverse_path, processes, pool, set(threading.enumerate()) - threads)
+  return pool
+
+
+def runs_alone():
+  """
+  Whether the calling thread is the only one in this process, not counting
+  the threads of route_pool that feed its processes.
+  """
+  pool_threads = _route_pool[4] if _route_pool is not None else set()
+  return all(thread is threading.current_thread() or thread in pool_threads for thread in threading.enumerate())
+
+
+def check_routes_parallel(config, traverse_path, lines, processes):
+  """
+  check_routes over blocks of routes in route_pool. Results are yielded in
+  file order. At most TASKS_PER_PROCESS blocks per process are sent ahead
+  of the one being read, so lines are read as the routes are validated,
+  and no more blocks are sent after one with an error or once the caller
+  stops reading.
+  """
+  pool = route_pool(config, traverse_path, processes)
+  blocks = route_blocks(lines)
+  sent = collections.deque(pool.apply_async(check_shared_routes, (block,))
+                           for block in itertools.islice(blocks, processes * TASKS_PER_PROCESS))
+  while sent:
+    results = sent.popleft().get()
+    if all(status == "ok" for status, _, _ in results):
+      for block in itertools.islice(blocks, 1):
+        sent.append(pool.apply_async(check_shared_routes, (block,)))
+    else:
+      sent.clear()
+    yield from results
+
+
+def validate_output(config, file_content, engine="step", processes=1):
+  """
+  file_content: the whole submission as a string, or an iterable of its
+  lines (e.g. a text file opened with newline='\\n'). Routes are validated
+  one at a time as they are read, stopping at the first error.
+  processes: at levels 1 and 2 routes don't depend on each other, with more
+  than one process they are validated in a pool of forked processes (where
+  fork is available). The result is the same as validating them in order.
+  The pool is only used from a process running a single thread (see
+  runs_alone): forking while other threads run (e.g. the worker's executor
+  threads) could leave the children with locks held by those threads, so
+  the routes are then validated in order.
+  """
+  traverse_path = ENGINES[engine]
+  lines = iter_lines(file_content) if isinstance(file_content, str) else iter(file_content)
+  reported_movs = int(next(lines, ""))
   total_movs = 0
-  delivery_points = []
+  # Bitset of the delivery point ids (1..N) already visited
+  num_points = len(config.delivery_points)
+  visited = bytearray(num_points // 8 + 1)
+  num_visited = 0
 
-  curr_point = 1
-  for route in file_content[1:]:
-    # print(total_movs / reported_movs)
+  if processes > 1 and config.level < 3 and "fork" in multiprocessing.get_all_start_methods() and runs_alone():
+    results = check_routes_parallel(config, traverse_path, lines, processes)
+  else:
+    # The drones keep moving from one route to the next
+    results = check_routes(config, traverse_path, (line for line in lines if line.strip() != ""), DroneClock())
 
-    if route.strip() == "":
-      continue
-    # print(f"--- PROCESSING ROUTE AT LINE {curr_point} ---")
-    
-    route = parse_route(route)
-    # print(f"Route info: {route}")
+  curr_point = 1
+  try:
+    for status, point_id, value in results:
+      # print(f"--- PROCESSING ROUTE AT LINE {curr_point} ---")
+      if status == "raise" and point_id is None:
+        raise value
 
-    if (pos := config.delivery_points[route["point_id"]-1].get("s")) is not None and curr_point != pos:
-      return None, f"Delivery point with id {route["point_id"]} needs to be at position {pos}, found at {curr_point}"
-    
-    # print("Route is well placed")
-    
-    coords, path_movs, err = config.traverse_path(route["initial_coords"], route["movs"])
-    if err != None:
-      return None, err
+      if (pos := config.delivery_points[point_id-1].get("s")) is not None and curr_point != pos:
+        return None, f"Delivery point with id {point_id} needs to be at position {pos}, found at {curr_point}"
     
-    # print("Drone doesn't crash or get out of map")
+      # print("Route is well placed")
     
-    if coords != (expected_coords := config.delivery_points[route["point_id"]-1].get("coords")):
-      return None, f"Movements to reach delivery point with id {route["point_id"]} from {route["initial_coords"]} end up at {coords}, expected {expected_coords}"
+      if status == "raise":
+        raise value
+      if status == "err":
+        return None, value
 
-    total_movs += path_movs 
-    delivery_points.append(route["point_id"])
+      total_movs += value 
+      if 0 < point_id <= num_points and not visited[point_id >> 3] & (1 << (point_id & 7)):
+        visited[point_id >> 3] |= 1 << (point_id & 7)
+        num_visited += 1
     
-    curr_point +=+ 1
+      curr_point +=+ 1
+  finally:
+    # Stops the pool (if any) when returning early
+    results.close()
 
   if reported_movs != total_movs: 
     return None, f"Reported movements at beginning of file don't match those in the routes, differ by {abs(reported_movs-total_movs)}"
-  if not config.contains_all_dpoints(delivery_points):
+  if num_visited != num_points:
     return None, "Drone doesn't visit all of the delivery points" 
   
   return reported_movs, None
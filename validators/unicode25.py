@@ -1,65 +1,281 @@
+import heapq
+import itertools
 import sys
+from array import array
 from collections import defaultdict
-from typing import Dict, Set, List, Tuple, Any
+from collections.abc import Mapping, Sequence
+from typing import Dict, Set, List, Tuple, Any, Iterator, Optional, Union
 import math
 
+import numpy as np
+
+try:
+    from validators.mapped import MappedText
+except ImportError:
+    # Los tests importan los validadores desde el propio directorio validators
+    from mapped import MappedText
+
 # Tipos para claridad
 ProfMateria = Tuple[int, int]
 StudentEnrollments = Dict[int, Set[int]]
 ProfHoursRequired = Dict[ProfMateria, int]
 ClassTuple = Tuple[int, int, int, int] # prof, materia, start, end
 Schedule = Dict[int, List[ClassTuple]]
+DayClasses = List[Tuple[int, int, int, int]] # prof, materia, start, end (ordenadas como las elige el alumno)
 
 def parse_input(file_path: str) -> Tuple[int, ProfHoursRequired, StudentEnrollments]:
-    """Lee el fichero de entrada y extrae los datos del problema."""
+    """
+    Lee el fichero de entrada y extrae los datos del problema. El fichero se
+    mapea en memoria y los números de cada bloque de líneas se parsean de una
+    vez desde sus bytes, sin leerlo línea a línea.
+    """
     prof_hours_required: ProfHoursRequired = {}
     student_enrollments: StudentEnrollments = {}
     
-    with open(file_path, 'r') as f:
+    with MappedText(file_path) as f:
         # 1. Número de días
         num_days = int(f.readline().strip())
         
         # 2. Combinaciones Profesor-Materia
         p = int(f.readline().strip())
-        for _ in range(p):
-            line = f.readline().strip()
-            if not line: continue
-            prof, materia, hours = map(int, line.split())
+        values, offsets = (column.tolist() for column in f.int_lines(p))
+        for lo, hi in zip(offsets, offsets[1:]):
+            if lo == hi: continue
+            prof, materia, hours = values[lo:hi]
             prof_hours_required[(prof, materia)] = hours
             
         # 3. Alumnos y matrículas
         line = f.readline().strip()
         a, m = map(int, line.split())
-        for _ in range(a):
-            line = f.readline().strip()
-            if not line: continue
-            parts = list(map(int, line.split()))
-            student_id = parts[0]
-            materias = set(parts[1:])
-            student_enrollments[student_id] = materias
+        for block in f.int_line_blocks(a):
+            values, offsets = (column.tolist() for column in block)
+            for lo, hi in zip(offsets, offsets[1:]):
+                if lo == hi: continue
+                student_enrollments[values[lo]] = set(values[lo + 1:hi])
             
     return num_days, prof_hours_required, student_enrollments
 
-# --- PARSE_OUTPUT (MODIFICADO) ---
-def parse_output(file: str) -> Tuple[Schedule, List[str]]:
+def input_arrays(num_days: int, prof_hours_required: ProfHoursRequired, student_enrollments: StudentEnrollments) -> Dict[str, np.ndarray]:
     """
-    Lee el fichero de salida (la solución) y lo estructura.
-    Devuelve el horario y una lista de errores de formato.
-    Si hay errores de formato, para inmediatamente.
+    Los datos de parse_input como arrays de numpy, para guardarlos como
+    snapshot (ver validators/snapshots.py). Las materias de cada alumno van
+    seguidas en enrollments, desde enrollment_offsets[i].
+    """
+    materias = [list(materias) for materias in student_enrollments.values()]
+    return {
+        "num_days": np.array(num_days, dtype=np.int64),
+        "prof_hours": np.array([(prof, materia, hours) for (prof, materia), hours in prof_hours_required.items()], dtype=np.int64).reshape(-1, 3),
+        "students": np.array(list(student_enrollments), dtype=np.int64),
+        "enrollments": np.array([materia for student in materias for materia in student], dtype=np.int64),
+        "enrollment_offsets": np.cumsum([0] + [len(student) for student in materias]),
+    }
+
+def input_from_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[int, ProfHoursRequired, StudentEnrollments]:
+    """Lo mismo que parse_input a partir de input_arrays, sin leer el fichero de texto."""
+    prof_hours_required = {(prof, materia): hours for prof, materia, hours in arrays["prof_hours"].tolist()}
+    enrollments, offsets = arrays["enrollments"].tolist(), arrays["enrollment_offsets"].tolist()
+    student_enrollments = {student: set(enrollments[lo:hi]) for student, lo, hi in zip(arrays["students"].tolist(), offsets, offsets[1:])}
+    return int(arrays["num_days"].item()), prof_hours_required, student_enrollments
+
+class DayView(Sequence):
+    """Clases de un día de un ColumnarSchedule, como tuplas (prof, materia, start, end)."""
+
+    __slots__ = ("columns", "lo", "hi")
+
+    def __init__(self, columns: Tuple[array, array, array, array], lo: int, hi: int):
+        self.columns = columns
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        k += self.lo
+        prof, materia, start, end = self.columns
+        return prof[k], materia[k], start[k], end[k]
+
+    def __iter__(self) -> Iterator[ClassTuple]:
+        lo, hi = self.lo, self.hi
+        return zip(*(column[lo:hi] for column in self.columns))
+
+class ColumnarSchedule(Mapping):
+    """
+    Horario guardado por columnas: cuatro array('i') con el profesor, la
+    materia, el inicio y el fin de todas las clases seguidas, y el tramo
+    [lo, hi) de cada día. Se usa como un Schedule de solo lectura, pero cada
+    clase ocupa 16 bytes en lugar de una tupla de cuatro enteros. Si algún
+    valor no cabe en 32 bits las columnas pasan a array('q'); si tampoco
+    cabe en 64, añadir el día da OverflowError.
+    """
+
+    def __init__(self):
+        self.prof = array('i')
+        self.materia = array('i')
+        self.start = array('i')
+        self.end = array('i')
+        self.day_offsets: Dict[int, Tuple[int, int]] = {}
+
+    @property
+    def columns(self) -> Tuple[array, array, array, array]:
+        return self.prof, self.materia, self.start, self.end
+
+    def __setitem__(self, day: int, classes: List[ClassTuple]):
+        """Añade las clases de un día nuevo al final de las columnas."""
+        if day in self.day_offsets:
+            raise KeyError(f"El dia {day} ya esta en el horario")
+        lo = len(self.prof)
+        while True:
+            try:
+                for column, values in zip(self.columns, zip(*classes)):
+                    column.extend(values)
+                break
+            except OverflowError:
+                for column in self.columns:
+                    del column[lo:]
+                if self.prof.typecode == 'q':
+                    raise
+                self.prof, self.materia, self.start, self.end = (array('q', column) for column in self.columns)
+        self.day_offsets[day] = (lo, len(self.prof))
+
+    def __getitem__(self, day: int) -> DayView:
+        lo, hi = self.day_offsets[day]
+        return DayView(self.columns, lo, hi)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.day_offsets)
+
+    def __len__(self) -> int:
+        return len(self.day_offsets)
+
+    def __contains__(self, day) -> bool:
+        return day in self.day_offsets
+
+    def keys(self):
+        return self.day_offsets.keys()
+
+    @classmethod
+    def from_schedule(cls, schedule: Schedule) -> "ColumnarSchedule":
+        columnar = cls()
+        for day, classes in schedule.items():
+            columnar[day] = classes
+        return columnar
+
+class ScheduleIndex:
     """
-    schedule: Schedule = {}
+    Horario de la solución junto con los índices que usan la validación y la
+    puntuación. Se rellenan a la vez que se añade cada clase, así que leer la
+    solución es la única pasada sobre todas las clases.
+    """
+
+    def __init__(self, columnar: bool = False):
+        self.schedule: Union[Schedule, ColumnarSchedule] = ColumnarSchedule() if columnar else {}
+        # Clases con duración <= 0, en orden (Error Duracion)
+        self.duration_errors: List[Tuple[int, int, int, int]] = [] # day, prof, start, end
+        # Horas impartidas por cada profesor-materia (Regla 1)
+        self.prof_hours_taught: Dict[ProfMateria, int] = defaultdict(int)
+        # Posiciones en schedule[day] de las clases con duración positiva de
+        # cada profesor por día (Regla 3)
+        self.prof_daily_schedule: Dict[int, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        # Posiciones en schedule[day] de las clases con duración positiva de
+        # cada día, agrupadas por materia y en orden dentro de cada una (Regla 2)
+        self.materia_slots: Dict[int, List[int]] = {}
+
+    @classmethod
+    def of(cls, schedule: Any) -> "ScheduleIndex":
+        """Índice de un horario ya leído (o el propio índice)."""
+        if isinstance(schedule, ScheduleIndex):
+            return schedule
+        index = cls()
+        index.schedule = schedule
+        for day, classes in schedule.items():
+            index.index_day(day, list(classes))
+        return index
+
+    def add_day(self, day: int, classes: List[ClassTuple]):
+        """Añade las clases de un día, en el orden del fichero."""
+        try:
+            self.schedule[day] = classes
+        except OverflowError:
+            # Valores que no caben ni en las columnas de 64 bits: el horario
+            # pasa a tuplas y se valida igual que sin columnar. Las posiciones
+            # de los índices no cambian
+            self.schedule = {d: list(c) for d, c in self.schedule.items()}
+            self.schedule[day] = classes
+        self.index_day(day, classes)
+
+    def index_day(self, day: int, classes: List[ClassTuple]):
+        """
+        Indexa las clases de un día que ya está en el horario. Las posiciones
+        son las de classes, que coinciden con las de schedule[day].
+        """
+        positive: List[int] = []
+        prof_hours_taught = self.prof_hours_taught
+        prof_daily_schedule = self.prof_daily_schedule
+        for k, (prof, materia, start, end) in enumerate(classes):
+            if start >= end:
+                self.duration_errors.append((day, prof, start, end))
+                continue
+            prof_hours_taught[(prof, materia)] += end - start
+            prof_daily_schedule[prof][day].append(k)
+            positive.append(k)
+        positive.sort(key=lambda k: classes[k][1])
+        self.materia_slots[day] = positive
+
+    def day_materias(self, day: int) -> Iterator[List[int]]:
+        """Posiciones de las clases con duración positiva de cada materia del día."""
+        classes = self.schedule[day]
+        if isinstance(classes, DayView):
+            # Directamente de la columna, sin crear la tupla de cada clase
+            materia, lo = classes.columns[1], classes.lo
+            key = lambda k: materia[lo + k]
+        else:
+            key = lambda k: classes[k][1]
+        for _, slots in itertools.groupby(self.materia_slots[day], key=key):
+            yield list(slots)
+
+    def spans(self, day: int, positions: List[int]) -> List[Tuple[int, int]]:
+        """Intervalos (start, end) de las clases del día en esas posiciones."""
+        classes = self.schedule[day]
+        if isinstance(classes, DayView):
+            _, _, start, end = classes.columns
+            lo = classes.lo
+            return [(start[lo + k], end[lo + k]) for k in positions]
+        return [classes[k][2:] for k in positions]
+
+def _iter_lines(file: str) -> Iterator[str]:
+    """Las líneas de file.split('\\n') sin construir la lista."""
+    start = 0
+    while (end := file.find('\n', start)) != -1:
+        yield file[start:end]
+        start = end + 1
+    yield file[start:]
+
+def parse_indexed(file: str, columnar: bool = False) -> Tuple[ScheduleIndex, List[str]]:
+    """
+    Lee el fichero de salida (la solución) en una sola pasada, indexando
+    cada clase según se lee. Devuelve el índice y una lista de errores de
+    formato. Si hay errores de formato, para inmediatamente.
+    columnar: guarda el horario como ColumnarSchedule en lugar de un dict
+    de listas de tuplas.
+    """
+    index = ScheduleIndex(columnar)
     format_errors: List[str] = []
     
-    lines = file.split('\n') 
+    lines = _iter_lines(file)
         
-    i = 0
     # MODIFICACION: Inicializar a -1 para permitir que el día 0 sea el primero.
     last_day = -1 
     
-    while i < len(lines):
-        line = lines[i].strip()
+    for line in lines:
+        line = line.strip()
         if not line:
-            i += 1
             continue
         
         # 1. Parsear el 'header' del día
@@ -70,71 +286,99 @@ def parse_output(file: str) -> Tuple[Schedule, List[str]]:
             day, n_classes = int(parts[0]), int(parts[1])
         except (IndexError, ValueError) as e:
             format_errors.append(f"Error Formato: Linea de cabecera mal formada '{line}'. Error: {e}")
-            return schedule, format_errors
+            return index, format_errors
 
         # 2. Comprobar orden de días
         if day <= last_day:
             format_errors.append(f"Error Formato: Dia {day} aparece fuera de orden (despues de {last_day}).")
-            return schedule, format_errors
+            return index, format_errors
             
         last_day = day
-        schedule[day] = []
+        classes: List[ClassTuple] = []
         
         # 3. Preparar lectura de clases
-        class_lines_start = i + 1
-        class_lines_end = i + 1 + n_classes
-        
-        if class_lines_end > len(lines):
+        if n_classes < 0:
+            index.add_day(day, classes)
+            format_errors.append(f"Error Formato: Dia {day} dice tener {n_classes} clases.")
+            return index, format_errors
+
+        class_lines = list(itertools.islice(lines, n_classes))
+        if len(class_lines) < n_classes:
+            index.add_day(day, classes)
             format_errors.append(f"Error Formato: Dia {day} dice tener {n_classes} clases, pero el fichero acaba.")
-            return schedule, format_errors
+            return index, format_errors
             
         # 4. Parsear las N clases
-        for j in range(class_lines_start, class_lines_end):
-            class_line = lines[j].strip()
+        for class_line in class_lines:
             try:
                 class_parts = class_line.split()
                 if len(class_parts) != 4:
                     raise ValueError(f"Una linea de clase debe tener 4 valores, encontrados: {len(class_parts)}")
                 prof, materia, start, end = map(int, class_parts)
-                schedule[day].append((prof, materia, start, end))
+                classes.append((prof, materia, start, end))
                 
             except (IndexError, ValueError) as e:
-                format_errors.append(f"Error Formato: Dia {day}, linea de clase mal formada '{class_line}'. Error: {e}")
-                return schedule, format_errors
-        
-        i = class_lines_end
+                index.add_day(day, classes)
+                format_errors.append(f"Error Formato: Dia {day}, linea de clase mal formada '{class_line.strip()}'. Error: {e}")
+                return index, format_errors
+
+        # 5. Indexar el día recién leído
+        index.add_day(day, classes)
             
-    return schedule, format_errors
+    return index, format_errors
 
-def _validate_prof_hours(schedule: Schedule) -> Tuple[bool, List[str], Dict[ProfMateria, int]]:
-    """Función helper para validar reglas de profesores y contar horas."""
-    errors: List[str] = []
-    prof_hours_taught: Dict[ProfMateria, int] = defaultdict(int)
-    prof_daily_schedule: Dict[int, Dict[int, List[Tuple[int, int]]]] = defaultdict(lambda: defaultdict(list))
+# --- PARSE_OUTPUT (MODIFICADO) ---
+def parse_output(file: str, columnar: bool = False) -> Tuple[Union[Schedule, ColumnarSchedule], List[str]]:
+    """
+    Lee el fichero de salida (la solución) y lo estructura.
+    Devuelve el horario y una lista de errores de formato.
+    Si hay errores de formato, para inmediatamente.
+    """
+    index, format_errors = parse_indexed(file, columnar)
+    return index.schedule, format_errors
 
-    # 1. Recopilar todas las clases
-    for day, classes in schedule.items():
-        for prof, materia, start, end in classes:
-            
-            if start >= end:
-                 errors.append(f"Error Duracion: Dia {day}, Profesor {prof} tiene clase con duracion <= 0: ({start}, {end}).")
-                 continue 
-            
-            duration = end - start
-            prof_hours_taught[(prof, materia)] += duration
-            prof_daily_schedule[prof][day].append((start, end))
+def _overlapping_pairs(intervals: List[Tuple[int, int]], adjacent: bool = False) -> Iterator[Tuple[int, int]]:
+    """
+    Barrido de los intervalos [start, end) ordenados por inicio (orden estable).
+    Devuelve los pares (i, j) de índices de intervals que se solapan, con j
+    antes que i en ese orden. Los intervalos deben tener duración positiva.
+    Con adjacent=True solo se comparan intervalos consecutivos en el orden;
+    si no, se devuelven todos los pares en O(n log n + pares).
+    """
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    if adjacent:
+        for j, i in zip(order, order[1:]):
+            if intervals[j][1] > intervals[i][0]:
+                yield i, j
+        return
+
+    active: List[Tuple[int, int]] = [] # heap (end, índice) de los intervalos abiertos
+    for i in order:
+        start, end = intervals[i]
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, j in active:
+            yield i, j
+        heapq.heappush(active, (end, i))
+
+def _prof_errors(index: ScheduleIndex) -> Iterator[str]:
+    """Función helper para validar reglas de profesores, error a error."""
+    # 1. Clases con duración <= 0 (el resto ya están recopiladas en el índice)
+    for day, prof, start, end in index.duration_errors:
+        yield f"Error Duracion: Dia {day}, Profesor {prof} tiene clase con duracion <= 0: ({start}, {end})."
+    prof_daily_schedule = index.prof_daily_schedule
 
     # 2. Validar Regla 3 (Continuidad y Solapamiento)
     for prof, days_data in prof_daily_schedule.items():
-        for day, classes in days_data.items():
-            if not classes:
+        for day, positions in days_data.items():
+            if not positions:
                 continue
             
+            classes = index.spans(day, positions)
             classes.sort(key=lambda x: x[0]) 
             
-            for k in range(len(classes) - 1):
-                if classes[k][1] > classes[k+1][0]:
-                    errors.append(f"Error Regla 3 (Solapamiento): Dia {day}, Profesor {prof} tiene clases solapadas: {classes[k]} y {classes[k+1]}.")
+            for k_next, k in _overlapping_pairs(classes, adjacent=True):
+                yield f"Error Regla 3 (Solapamiento): Dia {day}, Profesor {prof} tiene clases solapadas: {classes[k]} y {classes[k_next]}."
             
             if not classes:
                 continue
@@ -151,26 +395,22 @@ def _validate_prof_hours(schedule: Schedule) -> Tuple[bool, List[str], Dict[Prof
                     current_stretch = duration
                 
                 if current_stretch > 3:
-                    errors.append(f"Error Regla 3 (3h+): Dia {day}, Profesor {prof} imparte > 3 horas seguidas (bloque termina a las {end}).")
+                    yield f"Error Regla 3 (3h+): Dia {day}, Profesor {prof} imparte > 3 horas seguidas (bloque termina a las {end})."
 
                 last_end = end
 
-    if errors:
-        return False, errors, prof_hours_taught
-    
-    return True, [], prof_hours_taught
-
-# --- VALIDATE_SCHEDULE (MODIFICADO) ---
-def validate_schedule(
+def schedule_errors(
     num_days: int, 
     prof_hours_required: ProfHoursRequired, 
-    schedule: Schedule
-) -> List[str]:
+    schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex]
+) -> Iterator[str]:
     """
-    Valida el horario completo contra todas las reglas del problema.
-    Muestra *todos* los errores de reglas, incluso si son derivados.
+    Errores de reglas del horario, en el orden de validate_schedule. Cada
+    mensaje se construye cuando se pide, así que dejar de iterar deja de
+    validar.
     """
-    errors: List[str] = []
+    index = ScheduleIndex.of(schedule)
+    schedule = index.schedule
     
     # --- INICIO MODIFICACION REGLA 4 ---
     # Regla 4: Detectar si se usa indexación 0 o 1
@@ -191,17 +431,15 @@ def validate_schedule(
 
     missing_days = expected_days - found_days
     for d in sorted(list(missing_days)):
-        errors.append(f"Error Regla 4: El dia {d} falta en el fichero de salida (esperados: {expected_range_str}).")
+        yield f"Error Regla 4: El dia {d} falta en el fichero de salida (esperados: {expected_range_str})."
         
     extra_days = found_days - expected_days
     for d in sorted(list(extra_days)):
-        errors.append(f"Error Regla 4: El dia {d} aparece en la salida, pero no es valido (esperados: {expected_range_str}).")
+        yield f"Error Regla 4: El dia {d} aparece en la salida, pero no es valido (esperados: {expected_range_str})."
     # --- FIN MODIFICACION REGLA 4 ---
 
-    # Validar reglas de profesores (Regla 3) y contar horas (Regla 1)
-    valid_prof, prof_errors, prof_hours_taught = _validate_prof_hours(schedule)
-    if not valid_prof:
-        errors.extend(prof_errors)
+    # Validar reglas de profesores (Regla 3)
+    yield from _prof_errors(index)
 
     # Reglas de horario (Regla 5) y solapamiento de materias (Regla 2)
     for day, classes in schedule.items():
@@ -209,82 +447,175 @@ def validate_schedule(
         if day in extra_days:
             continue
             
-        materia_slots: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
-        
-        for prof, materia, start, end in classes:
+        # Regla 2: clases de la misma materia que se solapan (solo las de
+        # duración positiva). Cada conflicto se asocia a la clase que aparece
+        # después en el fichero
+        conflicts: Dict[int, List[int]] = defaultdict(list)
+        for slots in index.day_materias(day):
+            intervals = index.spans(day, slots)
+            for i, j in _overlapping_pairs(intervals):
+                conflicts[slots[max(i, j)]].append(slots[min(i, j)])
+
+        for k, (prof, materia, start, end) in enumerate(classes):
             # Regla 5: Horario 8:00 - 20:00
             if not (start >= 8 and end <= 20):
-                errors.append(f"Error Regla 5: Dia {day}, Clase ({prof}, {materia}) esta fuera de horario: [{start}, {end}). Valido: [8, 20).")
+                yield f"Error Regla 5: Dia {day}, Clase ({prof}, {materia}) esta fuera de horario: [{start}, {end}). Valido: [8, 20)."
             
-            # Comprobar solapamiento de esta materia (Regla 2)
-            if start < end: # Solo comprobar si la duración es positiva
-                for existing_start, existing_end in materia_slots[materia]:
-                    if max(start, existing_start) < min(end, existing_end):
-                        errors.append(f"Error Regla 2: Dia {day}, Materia {materia} se imparte simultaneamente. Conflicto entre [{start}, {end}) y [{existing_start}, {existing_end}).")
-                materia_slots[materia].append((start, end))
+            # Conflictos con las clases anteriores de la misma materia, en orden
+            for existing in sorted(conflicts.get(k, ())):
+                _, _, existing_start, existing_end = classes[existing]
+                yield f"Error Regla 2: Dia {day}, Materia {materia} se imparte simultaneamente. Conflicto entre [{start}, {end}) y [{existing_start}, {existing_end})."
 
     # Regla 1: Todos los profesores imparten sus horas
+    prof_hours_taught = index.prof_hours_taught
     for (prof, materia), hours_req in prof_hours_required.items():
         hours_taught = prof_hours_taught.get((prof, materia), 0)
         if hours_taught != hours_req:
-            errors.append(f"Error Regla 1: Profesor {prof}, Materia {materia} - Horas requeridas: {hours_req}, Horas impartidas: {hours_taught}.")
+            yield f"Error Regla 1: Profesor {prof}, Materia {materia} - Horas requeridas: {hours_req}, Horas impartidas: {hours_taught}."
             
     # Comprobar si se han impartido horas no asignadas
     for (prof, materia), hours_taught in prof_hours_taught.items():
         if (prof, materia) not in prof_hours_required and hours_taught > 0:
-            errors.append(f"Error Extra: Profesor {prof}, Materia {materia} imparte {hours_taught}h, pero no estaba en la entrada.")
+            yield f"Error Extra: Profesor {prof}, Materia {materia} imparte {hours_taught}h, pero no estaba en la entrada."
+
+# --- VALIDATE_SCHEDULE (MODIFICADO) ---
+def validate_schedule(
+    num_days: int, 
+    prof_hours_required: ProfHoursRequired, 
+    schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex],
+    max_errors: Optional[int] = None
+) -> List[str]:
+    """
+    Valida el horario completo contra todas las reglas del problema.
+    Muestra *todos* los errores de reglas, incluso si son derivados.
+    schedule puede ser el índice de parse_indexed, que se reutiliza tal cual.
+    max_errors: para al encontrar tantos errores (1 para quedarse con el
+    primero, None para todos). Los que devuelve son los primeros de la
+    lista completa. Con menos de 1 no se buscaría ninguno y cualquier
+    horario saldría válido, así que es un ValueError.
+    """
+    if max_errors is not None and max_errors < 1:
+        raise ValueError(f"max_errors debe ser al menos 1 o None, no {max_errors}")
+    return list(itertools.islice(schedule_errors(num_days, prof_hours_required, schedule), max_errors))
 
-    return errors
+# Valores de max_errors de validate_schedule por nombre ("up_to_k" es el propio k)
+ERROR_MODES = {
+    "first": 1,
+    "all": None,
+}
 
-def calculate_score(student_enrollments: StudentEnrollments, schedule: Schedule) -> int:
+def _sorted_days(schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex]) -> List[Tuple[DayClasses, Set[int]]]:
     """
-    Calcula la puntuación total basada en las horas de asistencia de los alumnos.
+    Clases de cada día con duración positiva ordenadas una sola vez como las
+    elige el alumno (por inicio y, a igual inicio, la más larga primero),
+    junto con las materias que se imparten ese día.
     """
-    total_score = 0
-    
-    for student_id, enrolled_materias in student_enrollments.items():
-        student_total_hours = 0
-        
-        for day in sorted(schedule.keys()):
-            classes_today = schedule.get(day, [])
-            
-            available_classes = []
-            for prof, materia, start, end in classes_today:
-                if materia in enrolled_materias and start < end:
-                    duration = end - start
-                    available_classes.append((start, -duration, end))
-            
-            if not available_classes:
-                continue
-                
-            available_classes.sort()
-            
-            student_day_hours = 0
-            last_class_end_time = 0 
-            
-            i = 0
-            while i < len(available_classes):
-                current_start_time = available_classes[i][0]
-                
-                if current_start_time < last_class_end_time:
-                    i += 1
-                    continue
-                
-                choices_at_this_time = []
-                while i < len(available_classes) and available_classes[i][0] == current_start_time:
-                    choices_at_this_time.append(available_classes[i])
-                    i += 1
-                
-                chosen_class = choices_at_this_time[0]
-                start, neg_duration, end = chosen_class
-                duration = -neg_duration
-                
-                student_day_hours += duration
+    if isinstance(schedule, ScheduleIndex):
+        schedule = schedule.schedule
+    days = []
+    for day in sorted(schedule.keys()):
+        # Se ordenan las tuplas del horario tal cual, sin copiarlas
+        classes = sorted((c for c in schedule[day] if c[2] < c[3]), key=lambda c: (c[2], c[2] - c[3]))
+        days.append((classes, {materia for _, materia, _, _ in classes}))
+    return days
+
+def _student_hours(enrolled_materias: Set[int], days: List[Tuple[DayClasses, Set[int]]]) -> int:
+    """
+    Horas que asiste un alumno: cada día va a la clase más larga de las que
+    empiezan primero entre sus materias, y después a la siguiente que empiece
+    cuando termine la anterior.
+    """
+    student_total_hours = 0
+    for classes, day_materias in days:
+        if enrolled_materias.isdisjoint(day_materias):
+            continue
+        last_class_end_time = 0
+        for _, materia, start, end in classes:
+            if start >= last_class_end_time and materia in enrolled_materias:
+                student_total_hours += end - start
                 last_class_end_time = end
-            
-            student_total_hours += student_day_hours
-            
-        total_score += student_total_hours
+    return student_total_hours
+
+def _enrollment_sets(student_enrollments: StudentEnrollments) -> Dict[frozenset, int]:
+    """Número de alumnos con cada conjunto de materias distinto."""
+    students_per_set: Dict[frozenset, int] = defaultdict(int)
+    for enrolled_materias in student_enrollments.values():
+        students_per_set[frozenset(enrolled_materias)] += 1
+    return students_per_set
+
+def _total_hours(student_enrollments: StudentEnrollments, schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex]) -> int:
+    """
+    Horas de asistencia de todos los alumnos. Los alumnos con las mismas
+    materias asisten a las mismas horas, así que se calculan una vez por
+    conjunto de materias distinto.
+    """
+    days = _sorted_days(schedule)
+    return sum(_student_hours(enrolled_materias, days) * num_students
+               for enrolled_materias, num_students in _enrollment_sets(student_enrollments).items())
+
+def _numpy_days(schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex], column: Dict[int, int]) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Arrays (start, duration, columna de la materia) de cada día, ordenados por
+    inicio, con las clases de duración positiva de las materias de column.
+    """
+    if isinstance(schedule, ScheduleIndex):
+        schedule = schedule.schedule
+    if not isinstance(schedule, ColumnarSchedule):
+        for classes, _ in _sorted_days(schedule):
+            classes = [(start, end - start, column[materia]) for _, materia, start, end in classes if materia in column]
+            yield tuple(np.array(classes, dtype=np.int64).reshape(-1, 3).T)
+        return
+
+    # Directamente de las columnas, sin crear una tupla por clase
+    materias = np.array(sorted(column), dtype=np.int64)
+    if not len(materias):
+        return
+    _, materia, start, end = (np.frombuffer(c, dtype=f"i{c.itemsize}").astype(np.int64) for c in schedule.columns)
+    for day in sorted(schedule.keys()):
+        lo, hi = schedule.day_offsets[day]
+        k = np.searchsorted(materias, materia[lo:hi]).clip(max=len(materias) - 1)
+        scored = np.flatnonzero((materias[k] == materia[lo:hi]) & (start[lo:hi] < end[lo:hi]))
+        scored = scored[np.argsort(start[lo:hi][scored], kind="stable")]
+        yield start[lo:hi][scored], (end[lo:hi] - start[lo:hi])[scored], k[scored]
+
+def _total_hours_numpy(student_enrollments: StudentEnrollments, schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex]) -> int:
+    """
+    Igual que _total_hours, pero con la elección de todos los conjuntos de
+    materias a la vez: se recorren las horas de inicio de cada día en orden
+    y cada conjunto que ya esté libre va a la clase más larga de sus materias
+    que empiece a esa hora.
+    """
+    students_per_set = _enrollment_sets(student_enrollments)
+    column = {materia: k for k, materia in enumerate(sorted(set().union(*students_per_set)))}
+    enrolled = np.zeros((len(students_per_set), len(column)), dtype=bool)
+    for row, enrolled_materias in enumerate(students_per_set):
+        enrolled[row, [column[materia] for materia in enrolled_materias]] = True
+    num_students = np.fromiter(students_per_set.values(), dtype=np.int64, count=len(students_per_set))
+
+    hours = np.zeros(len(students_per_set), dtype=np.int64)
+    for starts, durations, columns in _numpy_days(schedule, column):
+        if not len(starts):
+            continue
+        last_class_end_time = np.zeros(len(students_per_set), dtype=np.int64)
+        for group in np.split(np.arange(len(starts)), np.flatnonzero(np.diff(starts)) + 1):
+            start = starts[group[0]]
+            longest = (enrolled[:, columns[group]] * durations[group]).max(axis=1)
+            chosen = (longest > 0) & (last_class_end_time <= start)
+            hours += np.where(chosen, longest, 0)
+            last_class_end_time = np.where(chosen, start + longest, last_class_end_time)
+    return int(hours @ num_students)
+
+SCORE_ENGINES = {
+    "python": _total_hours,
+    "numpy": _total_hours_numpy,
+}
+
+def calculate_score(student_enrollments: StudentEnrollments, schedule: Union[Schedule, ColumnarSchedule, ScheduleIndex], engine: str = "python") -> int:
+    """
+    Calcula la puntuación total basada en las horas de asistencia de los alumnos.
+    engine: "python" o "numpy", ambos dan la misma puntuación.
+    """
+    total_score = SCORE_ENGINES[engine](student_enrollments, schedule)
         
     return (4.5 * math.log10(total_score + 1))
 